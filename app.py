@@ -1,10 +1,12 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 
-# 투자 내역을 저장할 데이터 프레임 초기화
+from utils.ledger import InvestmentLedger
+from utils.portfolio import current_portfolio
+
+# 투자 내역을 저장할 장부 초기화 (컬럼별 고정 dtype)
 if "investment_data" not in st.session_state:
-    st.session_state["investment_data"] = pd.DataFrame(columns=["서비스명", "상품명", "상품상태", "투자일자", "투자금액", "수익률", "투자기간", "대출유형"])
+    st.session_state["investment_data"] = InvestmentLedger()
 if "repayment_data" not in st.session_state:
     st.session_state["repayment_data"] = []
 if "current_page" not in st.session_state:
@@ -13,6 +15,8 @@ if "edit_mode" not in st.session_state:
     st.session_state["edit_mode"] = False
 
 st.set_page_config(page_title="P2P 투자 관리", layout="wide")
+# 주소로 고른 포트폴리오를 세션에 기억 (다른 페이지로 이동해도 유지)
+current_portfolio()
 st.title("📌 P2P 투자 관리")
 
 if st.session_state["current_page"] == "투자 내역 입력":
@@ -30,9 +34,16 @@ if st.session_state["current_page"] == "투자 내역 입력":
         submitted = st.form_submit_button("저장")
 
         if submitted:
-            new_entry = pd.DataFrame([[platform, product, status, pd.to_datetime(date).date(), amount, rate, period, loan_type]], 
-                                     columns=["서비스명", "상품명", "상품상태", "투자일자", "투자금액", "수익률", "투자기간", "대출유형"])
-            st.session_state["investment_data"] = pd.concat([st.session_state["investment_data"], new_entry], ignore_index=True)
+            st.session_state["investment_data"].append({
+                "서비스명": platform,
+                "상품명": product,
+                "상품상태": status,
+                "투자일자": date,
+                "투자금액": amount,
+                "수익률": rate,
+                "투자기간": period,
+                "대출유형": loan_type,
+            })
 
             st.success("✅ 투자 내역이 저장되었습니다! 회차별 내역 입력 페이지로 이동합니다.")
         
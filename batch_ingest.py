@@ -0,0 +1,167 @@
+# 플랫폼 내보내기 엑셀 파일이 모인 디렉터리를 화면 없이 수집하여 로컬 저장소(data/)에 반영
+#
+#   python batch_ingest.py exports/              # 새로 추가되거나 바뀐 파일만 반영
+#   python batch_ingest.py exports/ --recursive  # 하위 디렉터리까지
+#   python batch_ingest.py exports/ --force      # 모든 파일을 다시 반영
+#   python batch_ingest.py exports/ --portfolio kim  # 기본 대신 kim 포트폴리오(data/portfolios/kim/)에 반영
+#
+# 병합 페이지와 같은 시트 탐지, 병합 규칙(같은 키는 새 파일 내용으로 교체)을 사용하고
+# process_repayment_data 로 정리한 회차 내역도 함께 저장하므로 화면에서는 파싱 비용 없이 바로 불러옴
+# 디렉터리에서 삭제된 파일의 행은 저장소에 그대로 남음 (저장된 데이터 삭제는 병합 페이지에서)
+import argparse
+import os
+import sys
+
+from utils.group_index import GROUP_KEYS
+from utils.ingest import LocalFile, ingest_files
+from utils.parse_cache import ParseCache
+from utils.repayment import process_repayment_data
+from utils.merge import MAIN_KEYS, PortfolioMerge
+from utils.store import (DEFAULT_PORTFOLIO, STORE_DIR, load_combined, load_manifest, portfolio_dir, save_combined,
+                         save_manifest, store_generation, store_lock)
+from utils.workbook import file_digest
+
+EXTENSIONS = ('.xls', '.xlsx')
+
+
+def find_exports(directory, recursive=False):
+    if recursive:
+        paths = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    else:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    # 엑셀이 열어 둔 임시 파일(~$...)은 제외
+    return sorted(
+        os.path.abspath(path) for path in paths
+        if path.lower().endswith(EXTENSIONS) and not os.path.basename(path).startswith('~$')
+    )
+
+
+def _products(df1):
+    if df1 is None or df1.empty:
+        return set()
+    return set(map(tuple, df1[MAIN_KEYS].astype(str).values.tolist()))
+
+
+# 저장소에 상품이 모두 남아 있는 파일만 반영된 것으로 유지
+# (목록을 기록한 뒤에 화면에서 저장소를 지웠거나 덮어써서 행이 빠졌으면 다음 실행에서 다시 반영)
+# 상품 목록이 없는 예전 목록 항목도 한 번 다시 반영해서 기록
+def verified_manifest(manifest, df1):
+    products = _products(df1)
+    return {
+        path: entry for path, entry in manifest.items()
+        if 'products' in entry and all(tuple(product) in products for product in entry['products'])
+    }
+
+
+# 수정 시각과 크기가 그대로면 읽지 않고 건너뜀
+# 바뀌었더라도 내용 해시가 이미 반영한 파일과 같으면 목록만 갱신하고 건너뜀
+def changed_files(paths, manifest, force=False):
+    known_digests = {entry['digest']: entry for entry in manifest.values()}
+    changed = []
+    skipped = 0
+
+    for path in paths:
+        stat = os.stat(path)
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size}
+        previous = manifest.get(path)
+        if not force and previous is not None and previous['mtime'] == entry['mtime'] and previous['size'] == entry['size']:
+            skipped += 1
+            continue
+
+        file = LocalFile(path)
+        entry['digest'] = file_digest(file.getvalue())
+        if not force and entry['digest'] in known_digests:
+            # 이번 실행에서 함께 읽는 파일과 같으면 아직 상품 목록이 없음 (그 파일의 항목으로 확인)
+            entry['products'] = known_digests[entry['digest']].get('products', [])
+            manifest[path] = entry
+            skipped += 1
+            continue
+
+        known_digests[entry['digest']] = entry
+        changed.append((file, entry))
+
+    return changed, skipped
+
+
+def run(directory, store_dir=STORE_DIR, recursive=False, force=False, parallel=True):
+    with store_lock(store_dir):
+        stored = load_combined(store_dir)
+        generation = store_generation(store_dir)
+        manifest = load_manifest(store_dir)
+    manifest = verified_manifest(manifest, stored[0] if stored is not None else None)
+    changed, skipped = changed_files(find_exports(directory, recursive), manifest, force)
+    print(f"변경된 파일 {len(changed)}개, 건너뛴 파일 {skipped}개")
+
+    failures = 0
+    added = 0
+    merged = PortfolioMerge()
+    if changed:
+        if stored is not None:
+            merged.add(*stored, from_store=True)
+        del stored
+
+        files = [file for file, _ in changed]
+        results = ingest_files(files, ParseCache(max_entries=len(files)), parallel=parallel)
+
+        # 수정 시각 순으로 반영해 같은 상품은 가장 최근 파일 내용이 남도록 함
+        order = sorted(range(len(changed)), key=lambda i: changed[i][1]['mtime'])
+        for i in order:
+            file, entry = changed[i]
+            file_name, parsed, error = results[i]
+            if error is not None:
+                failures += 1
+                print(f"파일 '{file_name}' 처리 중 오류 발생: {error}", file=sys.stderr)
+            elif parsed.main is None:
+                failures += 1
+                print(f"파일 '{file_name}'에서 적절한 시트를 찾을 수 없음.", file=sys.stderr)
+            else:
+                merged.add(parsed.main, parsed.detail)
+                entry['products'] = parsed.main[MAIN_KEYS].drop_duplicates().astype(str).values.tolist()
+                manifest[file.file_id] = entry
+                added += 1
+
+    # 파싱하는 동안 화면에서 저장했으면 최신 저장소 위에 이번에 읽은 파일의 행만 다시 반영
+    # 저장이 끝난 뒤에 목록을 기록해야 중간에 실패한 파일을 다음 실행에서 다시 처리함
+    with store_lock(store_dir):
+        if store_generation(store_dir) != generation:
+            stored = load_combined(store_dir)
+            if added:
+                merged = merged.rebased(stored)
+            manifest = verified_manifest(manifest, stored[0] if stored is not None else None)
+        if added:
+            df1 = merged.main.frame()
+            df2 = merged.detail.frame()
+            save_combined(df1, df2, process_repayment_data(df2, key_columns=GROUP_KEYS), store_dir=store_dir)
+            manifest = verified_manifest(manifest, df1)
+            print(f"저장 완료: 상품 {len(df1):,}개, 회차 {len(df2):,}행 -> {store_dir}")
+        save_manifest(manifest, store_dir)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="P2P 투자 내역 엑셀 파일 일괄 수집")
+    parser.add_argument('directory', help="플랫폼 내보내기 파일이 있는 디렉터리")
+    parser.add_argument('--portfolio', default=DEFAULT_PORTFOLIO,
+                        help="반영할 포트폴리오 (화면의 ?portfolio= 와 같은 이름, 기본: default)")
+    parser.add_argument('--store-dir', help="저장소 디렉터리를 직접 지정 (--portfolio 대신 사용)")
+    parser.add_argument('--recursive', action='store_true', help="하위 디렉터리까지 수집")
+    parser.add_argument('--force', action='store_true', help="변경 여부와 관계없이 모든 파일 다시 반영")
+    parser.add_argument('--serial', action='store_true', help="프로세스 풀 없이 순서대로 파싱")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"디렉터리를 찾을 수 없습니다: {args.directory}")
+
+    store_dir = args.store_dir
+    if store_dir is None:
+        try:
+            store_dir = portfolio_dir(args.portfolio)
+        except ValueError as e:
+            parser.error(str(e))
+
+    failures = run(args.directory, store_dir, args.recursive, args.force, parallel=not args.serial)
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
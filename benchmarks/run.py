@@ -0,0 +1,233 @@
+# 파이프라인 성능 측정
+#
+#   python -m benchmarks.run                       # 10/100/1000 파일 측정 후 benchmarks/results/ 에 저장
+#   python -m benchmarks.run --sizes 10 100        # 파일 수 지정
+#   python -m benchmarks.run --compare a.json b.json   # 두 결과 비교 (느려진 단계 표시)
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_exports, make_ledger
+from utils.charts import BUCKETS, bucket_repayments
+from utils.db import connect, investment_summary, load_investments, load_repayments, platform_totals, \
+    repayment_summary, status_totals
+from utils.group_index import GROUP_KEYS, GroupIndex
+from utils.ingest import LocalFile, ingest_files
+from utils.merge import PortfolioMerge
+from utils.parse_cache import ParseCache
+from utils.projection import projected_vs_realized
+from utils.repayment import process_repayment_data
+from utils.workbook import READER_ENGINE
+from utils.xirr import realized_yields
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_SIZES = [10, 100, 1000]
+# 느려졌다고 판단하는 비율 (비교 시)
+REGRESSION_RATIO = 1.1
+# 예전 방식(불리언 필터)으로 조회할 상품 수 (전체를 돌면 1000 파일에서 너무 오래 걸림)
+SCAN_SAMPLE = 200
+
+
+def timed(func, repeat=1):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def merge_all(ingest_results):
+    merged = PortfolioMerge()
+    for _, parsed, error in ingest_results:
+        if error is None and parsed.main is not None:
+            merged.add(parsed.main, parsed.detail)
+    return merged.main.frame(), merged.detail.frame()
+
+
+# 예전 방식: 모든 파일을 이어 붙인 뒤 중복 제거
+def concat_dedup(ingest_results):
+    parsed = [p for _, p, error in ingest_results if error is None and p.main is not None]
+    df1 = pd.concat([p.main for p in parsed], ignore_index=True).drop_duplicates(subset=['업체명', '상품명'])
+    df2 = pd.concat([p.detail for p in parsed], ignore_index=True).drop_duplicates(subset=['업체명', '상품명', '회차'])
+    return df1, df2
+
+
+def scan_products(df, products):
+    for company, product in products:
+        df[(df['업체명'] == company) & (df['상품명'] == product)]
+
+
+def index_products(df, products):
+    index = GroupIndex(df)
+    for company, product in products:
+        index.get(company, product)
+
+
+# 투자/상환 내역을 임시 SQLite 파일에 한 번에 기록
+def write_ledger(db_path, investment_df, repayment_df):
+    with closing(connect(db_path)) as conn, conn:
+        conn.executemany(
+            "INSERT INTO investments (id, platform, product, status, invest_date, amount, rate, period, loan_type) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(investment_df['id'].tolist(), investment_df['서비스명'], investment_df['상품명'],
+                investment_df['상품상태'], investment_df['투자일자'].dt.strftime('%Y-%m-%d'),
+                investment_df['투자금액'].tolist(), investment_df['수익률'].tolist(),
+                investment_df['투자기간'].tolist(), investment_df['대출유형']))
+        conn.executemany(
+            "INSERT INTO repayments (investment_id, round, due_date, principal, interest, tax, fee, completed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(repayment_df['investment_id'].tolist(), repayment_df['회차'].tolist(),
+                repayment_df['지급예정일'].dt.strftime('%Y-%m-%d'), repayment_df['원금'].tolist(),
+                repayment_df['이자'].tolist(), repayment_df['세금'].tolist(), repayment_df['수수료'].tolist(),
+                repayment_df['상환완료'].astype(int).tolist()))
+
+
+def dashboard_aggregates(db_path, as_of):
+    investment_df = load_investments(db_path)
+    repayment_df = load_repayments(db_path)
+    investment_summary(db_path)
+    repayment_summary(db_path)
+    platform_totals(db_path)
+    status_totals(db_path)
+    for bucket in BUCKETS:
+        bucket_repayments(repayment_df, bucket)
+    projected_vs_realized(investment_df, repayment_df)
+    realized_yields(investment_df, repayment_df, as_of)
+
+
+def bench_size(files, args, work_dir):
+    paths = generate_exports(os.path.join(work_dir, 'exports'), files, args.products, args.rounds)
+    uploads = [LocalFile(path) for path in paths]
+    # 디스크 읽기 시간은 측정에서 제외
+    for upload in uploads:
+        upload.getvalue()
+    results = []
+
+    def record(phase, seconds, rows=None):
+        results.append({'files': files, 'phase': phase, 'seconds': round(seconds, 6), 'rows': rows})
+        print(f"  {files:>5} 파일  {phase:<24} {seconds:9.4f}s" + (f"  ({rows:,})" if rows is not None else ""))
+
+    seconds, ingest_results = timed(lambda: ingest_files(uploads, ParseCache(max_entries=files), parallel=False))
+    record('ingest_serial', seconds)
+    seconds, _ = timed(lambda: ingest_files(uploads, ParseCache(max_entries=files), parallel=True))
+    record('ingest_parallel', seconds)
+    cache = ParseCache(max_entries=files)
+    ingest_files(uploads, cache, parallel=False)
+    seconds, _ = timed(lambda: ingest_files(uploads, cache), args.repeat)
+    record('ingest_cached', seconds)
+
+    seconds, (df1, df2) = timed(lambda: concat_dedup(ingest_results), args.repeat)
+    record('concat_dedup', seconds, len(df2))
+    seconds, (df1, df2) = timed(lambda: merge_all(ingest_results), args.repeat)
+    record('merge_upsert', seconds, len(df2))
+
+    seconds, _ = timed(lambda: process_repayment_data(df2, key_columns=GROUP_KEYS), args.repeat)
+    record('process_repayment_data', seconds, len(df2))
+
+    products = list(df1[GROUP_KEYS].itertuples(index=False, name=None))
+    sample = products[:SCAN_SAMPLE]
+    seconds, _ = timed(lambda: scan_products(df2, sample), args.repeat)
+    record('product_filter_scan', seconds / max(len(sample), 1), len(sample))
+    seconds, _ = timed(lambda: index_products(df2, products), args.repeat)
+    record('product_filter_index', seconds / max(len(products), 1), len(products))
+
+    # page_02 는 파일 수와 같은 규모의 투자 건수로 측정 (파일 1개 = 상품 수만큼 투자)
+    investment_df, repayment_df = make_ledger(files * args.products, args.rounds, seed=files)
+    db_path = os.path.join(work_dir, f'bench_{files}.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    write_ledger(db_path, investment_df, repayment_df)
+    as_of = pd.Timestamp('2025-06-30')
+    seconds, _ = timed(lambda: dashboard_aggregates(db_path, as_of), args.repeat)
+    record('page_02_aggregates', seconds, len(repayment_df))
+    return results
+
+
+def run(args):
+    work_dir = args.work_dir or os.path.join(tempfile.gettempdir(), 'fundingboard_bench')
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for files in args.sizes:
+        results.extend(bench_size(files, args, os.path.join(work_dir, f'{files}_{args.products}_{args.rounds}')))
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'engine': READER_ENGINE,
+        'params': {'sizes': args.sizes, 'products': args.products, 'rounds': args.rounds, 'repeat': args.repeat},
+        'results': results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{report['revision'] or 'local'}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {path}")
+    return path
+
+
+def compare(base_path, new_path):
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    base_seconds = {(r['files'], r['phase']): r['seconds'] for r in base['results']}
+    regressions = 0
+    print(f"{'파일':>5}  {'단계':<24} {'이전':>10} {'이후':>10} {'비율':>7}")
+    for r in new['results']:
+        key = (r['files'], r['phase'])
+        if key not in base_seconds:
+            continue
+        before = base_seconds[key]
+        ratio = r['seconds'] / before if before else float('inf')
+        flag = ''
+        if ratio > REGRESSION_RATIO:
+            flag = '  ▲ 느려짐'
+            regressions += 1
+        print(f"{r['files']:>5}  {r['phase']:<24} {before:10.4f} {r['seconds']:10.4f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="P2P 투자 대시보드 파이프라인 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="측정할 파일 수")
+    parser.add_argument('--products', type=int, default=20, help="파일당 상품 수")
+    parser.add_argument('--rounds', type=int, default=12, help="상품당 최대 회차 수")
+    parser.add_argument('--repeat', type=int, default=3, help="반복 측정 횟수 (최솟값 기록)")
+    parser.add_argument('--work-dir', help="생성한 엑셀 파일을 둘 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument('--output', default=RESULTS_DIR, help="결과 JSON 저장 디렉터리")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare)
+        raise SystemExit(1 if regressions else 0)
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from utils.workbook import DETAIL_SHEETS, MAIN_SHEETS
+
+COMPANIES = [f"{name}펀딩" for name in ["가람", "나래", "다온", "라온", "마루", "바다", "사랑", "아라", "자람", "차오름",
+                                         "카라", "타래", "파랑", "하늘", "미소", "보람", "새솔", "여울", "온새", "한결"]]
+PRODUCT_TYPES = ["부동산 담보", "어음·매출채권 담보", "기타 담보", "개인 신용", "법인 신용", "부동산 PF"]
+
+
+# 플랫폼 내보내기 파일 한 개 생성
+# 투자진행중 파일은 지난 회차만 실제 지급 컬럼이 채워지고, 투자종료 파일은 모든 회차가 채워짐
+# 같은 업체의 파일끼리는 상품이 일부 겹치도록 만들어 중복 제거 경로도 측정되게 함
+def make_export(path, company, file_no, products=20, rounds=12, ongoing=True, seed=0):
+    rng = random.Random(seed)
+    today = pd.Timestamp("2025-06-30")
+    main_rows = []
+    detail_rows = []
+
+    for p in range(products):
+        product_no = file_no * products // 2 + p
+        product = f"{company} 제{product_no + 1}호 {rng.choice(PRODUCT_TYPES)} 상품"
+        contract_date = pd.Timestamp("2023-01-01") + pd.Timedelta(days=rng.randint(0, 800))
+        product_type = rng.choice(PRODUCT_TYPES)
+        amount = rng.choice([10000, 50000, 100000, 500000, 1000000])
+        rate = rng.choice([8.0, 10.5, 12.0, 14.5, 17.0])
+        period = rng.randint(max(1, rounds // 2), rounds)
+        kind = "일반" if rng.random() < 0.9 else "자동투자"
+
+        main_rows.append({
+            "투자계약 구분": kind, "투자계약일": contract_date, "업체명": company, "상품명": product,
+            "상품유형": product_type, "투자금액(원)": amount, "수익률(%)": rate, "투자기간(개월)": period,
+            "상태": "투자중" if ongoing else "상환완료",
+        })
+
+        monthly_interest = int(amount * rate / 100 / 12)
+        for round_no in range(1, period + 1):
+            due_date = contract_date + pd.DateOffset(months=round_no)
+            principal = amount if round_no == period else 0
+            paid = (not ongoing) or due_date <= today
+            late_interest = rng.choice([0, 0, 0, 0, 120]) if paid else None
+            detail_rows.append({
+                "투자계약 구분": kind, "투자계약일": contract_date, "업체명": company, "상품명": product,
+                "상품유형": product_type, "회차": round_no,
+                "예정지급일": due_date, "예정 지급원금(원)": principal, "예정 지급이자(원)": monthly_interest,
+                "실제 지급일": due_date if paid else None,
+                "지급원금(원)": principal if paid else None,
+                "지급이자(원)": monthly_interest if paid else None,
+                "연체이자(원)": late_interest,
+                "실제 지급금액(원)": principal + int(monthly_interest * 0.846) if paid else None,
+            })
+
+    sheet_index = 0 if ongoing else 1
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        pd.DataFrame(main_rows).to_excel(writer, sheet_name=MAIN_SHEETS[sheet_index], index=False)
+        pd.DataFrame(detail_rows).to_excel(writer, sheet_name=DETAIL_SHEETS[sheet_index], index=False)
+
+
+# count 개의 내보내기 파일을 directory 에 생성 (이미 있으면 재사용)
+def generate_exports(directory, count, products=20, rounds=12):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        company = COMPANIES[i % len(COMPANIES)]
+        file_no = i // len(COMPANIES)
+        ongoing = i % 3 != 2
+        path = os.path.join(directory, f"{i:04d}_{company}_{'진행중' if ongoing else '종료'}.xlsx")
+        if not os.path.exists(path):
+            make_export(path, company, file_no, products, rounds, ongoing, seed=i)
+        paths.append(path)
+    return paths
+
+
+# 대시보드(page_02) 집계 측정용 투자/상환 내역
+def make_ledger(investments, rounds=12, seed=0):
+    rng = np.random.default_rng(seed)
+    investment_df = pd.DataFrame({
+        "id": np.arange(1, investments + 1),
+        "서비스명": rng.choice(COMPANIES, investments),
+        "상품명": [f"상품 {i}" for i in range(investments)],
+        "상품상태": rng.choice(["투자중", "상환완료", "연체"], investments, p=[0.6, 0.35, 0.05]),
+        "투자일자": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 800, investments), unit="D"),
+        "투자금액": rng.choice([10000, 50000, 100000, 500000], investments),
+        "수익률": rng.choice([8.0, 10.5, 12.0, 14.5], investments),
+        "투자기간": rng.integers(1, rounds + 1, investments),
+        "대출유형": rng.choice(PRODUCT_TYPES, investments),
+    })
+
+    investment_ids = np.repeat(investment_df["id"].to_numpy(), investment_df["투자기간"].to_numpy())
+    rounds_no = np.concatenate([np.arange(1, period + 1) for period in investment_df["투자기간"]])
+    start = np.repeat(investment_df["투자일자"].to_numpy(), investment_df["투자기간"].to_numpy())
+    repayment_df = pd.DataFrame({
+        "investment_id": investment_ids,
+        "회차": rounds_no,
+        "지급예정일": start + pd.to_timedelta(rounds_no * 30, unit="D"),
+        "원금": np.where(rounds_no == np.repeat(investment_df["투자기간"].to_numpy(), investment_df["투자기간"].to_numpy()),
+                       np.repeat(investment_df["투자금액"].to_numpy(), investment_df["투자기간"].to_numpy()), 0),
+        "이자": 1000,
+        "세금": 150,
+        "수수료": 0,
+        "상환완료": rng.random(len(investment_ids)) < 0.6,
+    })
+    return investment_df, repayment_df
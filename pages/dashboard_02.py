@@ -1,115 +1,241 @@
 import streamlit as st
 import pandas as pd
 
-def process_repayment_data(df):
-    # 새로운 컬럼명 매핑
-    column_mapping = {
-        '실제 지급일': '지급일',
-        '지급원금(원)': '지급원금',
-        '지급이자(원)': '지급이자',
-        '연체이자(원)': '연체이자',
-        '실제 지급금액(원)': '실제지급액',
-        '예정지급일': '지급일',
-        '예정 지급원금(원)': '지급원금',
-        '예정 지급이자(원)': '지급이자'
-    }
-    
-    # 컬럼명 변경
-    df = df.rename(columns=column_mapping)
-    
-    # 필요한 컬럼 생성 및 초기화
-    required_columns = ['회차', '지급일', '지급원금', '지급이자', '연체이자', '수수료', '실제지급액']
-    for col in required_columns:
-        if col not in df.columns:
-            df[col] = None
-            
-    # 수수료 컬럼 추가
-    df['수수료'] = 0
-    
-    # 예정 지급건의 실제지급액 계산
-    mask = (df['실제지급액'].isna()) & (df['지급원금'].notna()) & (df['지급이자'].notna())
-    df.loc[mask, '실제지급액'] = df.loc[mask].apply(
-        lambda x: (x['지급원금'] + x['지급이자'] - x['수수료']) 
-        if pd.notna(x['지급원금']) and pd.notna(x['지급이자']) 
-        else None, 
-        axis=1
-    )
-    
-    # 연체이자 0으로 초기화
-    df['연체이자'] = df['연체이자'].fillna(0)
-    
-    # 컬럼 순서 정리
-    df = df[required_columns]
-    
-    return df
+from utils.export import show_export
+from utils.group_index import GROUP_KEYS, GroupIndex
+from utils.ingest import IngestJob
+from utils.merge_cache import load_merge, save_merge
+from utils.pagination import paginate
+from utils.parse_cache import shared_parse_cache
+from utils.portfolio import current_portfolio
+from utils.profiling import finish_fragment, finish_rerun, fragment_timer, start_rerun
+from utils.progress import INITIAL_WAIT, show_ingest_progress
+from utils.repayment import REPAYMENT_COLUMNS, process_repayment_data
+from utils.search import ProductSearch, show_search
+from utils.store import clear_store, portfolio_dir
+from utils.uploads import MB, SESSION_MEMORY_BUDGET, UploadRegistry, discard_uploaded
 
 st.set_page_config(page_title="P2P 투자 관리", layout="wide")
 
+# 재실행 단계별 소요 시간 기록 (사이드바에서 표시/프로파일링 선택)
+timer = start_rerun("dashboard_02")
+
 st.title('엑셀 파일 병합')
 
-# 업로드된 파일을 저장할 세션 상태 초기화
-if 'uploaded_files' not in st.session_state:
-    st.session_state.uploaded_files = []
+# 병합 데이터를 저장할 포트폴리오의 저장소
+store_dir = portfolio_dir(current_portfolio())
+st.caption(f"포트폴리오: {st.session_state.portfolio}")
+
+# 업로드된 파일 목록 (내용이 같은 파일은 한 번만 등록, 파싱이 끝나면 원본 바이트는 해제)
+if 'uploads' not in st.session_state:
+    st.session_state.uploads = UploadRegistry()
 if 'selected_products' not in st.session_state:
     st.session_state.selected_products = {}
 if 'selected_company' not in st.session_state:
     st.session_state.selected_company = None
 if 'processed_data' not in st.session_state:
     st.session_state.processed_data = False
+# 실행할 때마다 바꿔서 업로더를 비우는 위젯 키 번호
+if 'uploader_key' not in st.session_state:
+    st.session_state.uploader_key = 0
+# 재실행마다 엑셀을 다시 읽지 않도록 파싱 결과 캐시 (두 병합 페이지와 다른 사용자 세션이 공유)
+# 같은 파일은 서버에서 한 번만 파싱하고, 세션이 끝나면 이 세션이 잡고 있던 참조를 놓음
+if 'parse_cache' not in st.session_state:
+    st.session_state.parse_cache = shared_parse_cache().session()
+# 업로드 파일을 누적 병합한 결과 (이전 세션에서 저장해 둔 병합 데이터가 있으면 먼저 반영)
+# 같은 저장소를 불러오고 같은 파일을 올린 다른 세션과는 병합 데이터와 인덱스를 함께 씀
+# 저장할 때 그 사이에 다른 세션이나 일괄 수집이 저장했는지 확인하도록 불러온 저장소의 세대 id 기록
+if 'merged' not in st.session_state:
+    st.session_state.merged, st.session_state.store_generation = load_merge(store_dir)
+    st.session_state.has_stored_data = st.session_state.merged.version > 0
+merged = st.session_state.merged
+uploads = st.session_state.uploads
 
 # 파일 업로드 기능 (여러 개 가능)
-uploaded_files = st.file_uploader("엑셀 파일 업로드", type=["xls", "xlsx"], accept_multiple_files=True)
+uploaded_files = st.file_uploader(
+    "엑셀 파일 업로드", type=["xls", "xlsx"], accept_multiple_files=True,
+    key=f"uploader_{st.session_state.uploader_key}",
+)
+
+# 업로더에 선택된 파일도 세션 메모리 한도에 포함
+held_bytes = uploads.held_bytes(uploaded_files or [])
+if held_bytes and uploads.pending_bytes + held_bytes > SESSION_MEMORY_BUDGET:
+    st.warning(
+        f"선택한 파일({held_bytes / MB:,.1f}MB)과 아직 파싱하지 않은 파일을 합치면 "
+        f"세션 메모리 한도({SESSION_MEMORY_BUDGET / MB:,.0f}MB)를 넘습니다. 한도를 넘는 파일은 추가되지 않습니다."
+    )
 
 # 실행 버튼
 run_button = st.button("실행")
 
 # 파일이 업로드되고 실행 버튼이 눌렸을 때만 처리
 if run_button and uploaded_files:
-    # 기존 파일 목록 유지하면서 새 파일 추가
-    st.session_state.uploaded_files.extend(uploaded_files)
+    # 기존 파일 목록 유지하면서 내용이 다른 새 파일만 추가
+    added, duplicates, rejected = uploads.add(uploaded_files)
     
     # 처리 상태 업데이트
     st.session_state.processed_data = True
+
+    # 업로더를 비워서 위젯이 들고 있던 원본을 놓음 (등록된 원본은 파싱이 끝나면 해제)
+    discard_uploaded(uploaded_files)
+    st.session_state.uploader_key += 1
+    st.session_state.upload_result = (added, duplicates, rejected)
+    st.rerun()
+
+# 실행 결과 (업로더를 비우느라 다시 실행된 뒤에 표시)
+upload_result = st.session_state.pop('upload_result', None)
+if upload_result is not None:
+    added, duplicates, rejected = upload_result
+    st.success(f"데이터 반영이 완료되었습니다! (새 파일 {added}개)")
+    if duplicates:
+        st.info(f"이미 추가된 파일과 내용이 같은 {duplicates}개 파일은 건너뛰었습니다.")
+    if rejected:
+        st.warning(f"세션 메모리 한도를 넘어 추가하지 못한 파일 (파싱이 끝난 뒤 다시 업로드하세요): {', '.join(rejected)}")
+
+# 저장된 데이터 삭제 버튼
+if st.session_state.has_stored_data and st.button("저장된 데이터 삭제"):
+    clear_store(store_dir)
+    del st.session_state.merged
+    st.rerun()
     
-    st.success("데이터 반영이 완료되었습니다!")
-    
-# 데이터 처리 및 표시
-if st.session_state.uploaded_files:
-    df1_list = []
-    df2_list = []
-    
-    for file in st.session_state.uploaded_files:
-        try:
-            xls = pd.ExcelFile(file)
+# 업체 선택과 상품별 회차 내역
+# st.fragment 이므로 업체를 바꾸거나 상품을 펼칠 때는 파일 처리/병합 없이 이 함수만 다시 실행됨
+@st.fragment
+def show_products(df1_unique, repayment_index):
+    timer = fragment_timer("dashboard_02")
+    rendered_rows = 0
+
+    # 업체명 리스트 생성
+    company_list = df1_unique['업체명'].unique()
 
-            # 가능한 시트명 목록 정의
-            df1_sheets = ['세부 투자내역(투자진행중)', '세부 투자내역(투자종료)', '투자내역']
-            df2_sheets = ['세부 투자내역(투자진행중) 회차별 상세정보', '세부 투자내역(투자종료) 회차별 상세정보', '회차별 상세정보']
+    # 업체 선택 옵션 (라디오 버튼 사용)
+    selected_company = st.radio(
+        "업체 선택", 
+        options=company_list,
+        index=0 if len(company_list) > 0 else None,
+        key='company_selector',
+        horizontal=True  # 수평으로 배치
+    )
 
-            # 첫 번째로 존재하는 시트 선택
-            sheet_main = next((name for name in df1_sheets if name in xls.sheet_names), None)
-            sheet_detail = next((name for name in df2_sheets if name in xls.sheet_names), None)
+    st.session_state.selected_company = selected_company
 
-            if sheet_main and sheet_detail:
-                df1 = pd.read_excel(xls, sheet_name=sheet_main)
-                df2 = pd.read_excel(xls, sheet_name=sheet_detail)
+    if st.session_state.selected_company:
+        st.subheader(f"{st.session_state.selected_company} 투자 상품")
 
-                # 파일명 추가하여 중복 확인 시 사용
-                df1['파일명'] = file.name
-                df2['파일명'] = file.name
+        # 선택된 업체의 상품 필터링
+        df1_selected = df1_unique[df1_unique['업체명'] == st.session_state.selected_company]
 
-                df1_list.append(df1)
-                df2_list.append(df2)
-            else:
-                st.warning(f"파일 '{file.name}'에서 적절한 시트를 찾을 수 없음.")
+        # 상품이 많은 업체는 페이지 단위로 나누어 표시 (업체마다 페이지 위치를 따로 기억)
+        df1_page = paginate(df1_selected, key=f"product_page_{st.session_state.selected_company}")
 
-        except Exception as e:
-            st.error(f"파일 '{file.name}' 처리 중 오류 발생: {e}")
+        for _, row in df1_page.iterrows():
+            product = row['상품명']
+
+            # 투자계약일과 상품유형 정보 추가
+            display_info = f"{product}"
+
+            if '투자계약일' in row and pd.notna(row['투자계약일']):
+                contract_date = row['투자계약일']
+                if isinstance(contract_date, pd.Timestamp):
+                    contract_date = contract_date.strftime('%Y-%m-%d')
+                display_info += f" | 계약일: {contract_date}"
+
+            if '상품유형' in row and pd.notna(row['상품유형']):
+                display_info += f" | 유형: {row['상품유형']}"
+
+            # 펼친 상품의 회차 내역만 만들어서 전송 (닫힌 상품은 제목만 표시)
+            product_expander = st.expander(
+                display_info,
+                key=f"product_{st.session_state.selected_company}_{product}",
+                on_change="rerun"
+            )
+            with product_expander:
+                if not product_expander.open:
+                    continue
+
+                # 미리 정리해 둔 회차 내역에서 업체명과 상품명 기준으로 조회
+                df_product_details = repayment_index.get(st.session_state.selected_company, product)
+
+                if not df_product_details.empty:
+                    # 회차가 첫 번째 열인 표시용 컬럼만 선택
+                    processed_df = df_product_details[REPAYMENT_COLUMNS]
+
+                    # 인덱스 숨기기 (hide_index=True)
+                    st.dataframe(processed_df, hide_index=True)
+                    rendered_rows += len(processed_df)
+                else:
+                    st.info(f"'{product}' 상품의 회차 정보가 없습니다.")
+
+    timer.lap("표시", rows=rendered_rows)
+    finish_fragment(timer)
+
+
+# 데이터 처리 및 표시
+timer.lap("준비")
+if uploads or st.session_state.has_stored_data:
+    # 진행 중인 작업이 없으면 아직 병합되지 않은 파일을 백그라운드에서 파싱 시작
+    # (파일이 많으면 프로세스 풀에서 병렬 처리, 화면은 멈추지 않고 파싱된 파일부터 병합)
+    job = st.session_state.get('ingest_job')
+    if job is None or job.exhausted:
+        pending_files = merged.pending(uploads)
+        job = IngestJob(pending_files, st.session_state.parse_cache) if pending_files else None
+        st.session_state.ingest_job = job
+        if job is not None:
+            job.wait(INITIAL_WAIT)
+    version_before = merged.version
+    ingest_results = job.take_ready() if job is not None else []
+    timer.lap("파싱", rows=len(ingest_results))
+
+    # 새 파일의 행만 기존 병합 결과에 반영 (같은 키의 행은 새 파일 내용으로 교체)
+    for file, (file_name, parsed, error) in ingest_results:
+        if error is not None and file.released:
+            # 원본을 해제한 뒤 파싱 캐시에서도 밀려난 파일 (저장된 데이터 삭제 후 다시 병합하는 경우)
+            # 병합된 것으로 표시하지 않아야 같은 파일을 다시 올렸을 때 반영됨
+            uploads.remove(file.digest)
+            st.warning(f"파일 '{file_name}'의 원본이 메모리에서 해제되었습니다. 다시 업로드하세요.")
+            continue
+        if error is not None:
+            merged.errors[file.file_id] = f"파일 '{file_name}' 처리 중 오류 발생: {error}"
+        elif parsed.main is None:
+            merged.warnings[file.file_id] = f"파일 '{file_name}'에서 적절한 시트를 찾을 수 없음."
+        else:
+            merged.add(parsed.main, parsed.detail, digest=file.digest)
+        merged.merged_ids.add(file.file_id)
+        uploads.release(file.digest)
+
+    # 작업이 도는 동안 실행 버튼으로 추가된 파일은 이번 재실행에서 바로 다음 작업으로 시작
+    # (진행 표시가 사라지면 다시 실행해 줄 것이 없으므로 미루면 파싱되지 않은 채로 남음)
+    if job is not None and job.exhausted:
+        pending_files = merged.pending(uploads)
+        if pending_files:
+            job = IngestJob(pending_files, st.session_state.parse_cache)
+            st.session_state.ingest_job = job
+    timer.lap("병합")
+
+    for message in merged.errors.values():
+        st.error(message)
+    for message in merged.warnings.values():
+        st.warning(message)
+
+    # 아직 파싱 중인 파일이 있으면 진행 상황 표시 (이미 병합된 업체는 아래에서 바로 볼 수 있음)
+    if job is not None and not job.exhausted:
+        show_ingest_progress(job)
     
-    if df1_list and df2_list:
-        # 모든 파일 합치기
-        df1_combined = pd.concat(df1_list, ignore_index=True)
-        df2_combined = pd.concat(df2_list, ignore_index=True)
+    # 새 파일이 반영된 경우 저장소에 기록 (다음 세션에서 바로 불러옴)
+    if merged.version != version_before:
+        try:
+            merged, st.session_state.store_generation = save_merge(merged, store_dir, st.session_state.store_generation)
+            st.session_state.merged = merged
+            st.session_state.has_stored_data = True
+        except Exception as e:
+            st.error(f"데이터 저장 중 오류 발생: {e}")
+    timer.lap("저장")
+
+    if merged.version > 0:
+        # 병합된 전체 데이터 (키 기준으로 이미 중복이 제거되어 있음)
+        df1_combined = merged.main.frame()
+        df2_combined = merged.detail.frame()
+        timer.lap("병합", rows=len(df2_combined))
         
         # 필요한 모든 컬럼 확인
         required_columns = ['업체명', '상품명']
@@ -120,75 +246,37 @@ if st.session_state.uploaded_files:
             if col not in df1_combined.columns:
                 st.error(f"'{col}' 컬럼이 데이터에 존재하지 않습니다.")
         
-        # 업체명과 상품명 기준으로 중복 제거하되, 추가 정보 컬럼도 유지
+        # 업체명과 상품명 기준으로 병합된 데이터에서 추가 정보 컬럼도 유지
         display_columns = required_columns.copy()
         display_columns.extend([col for col in additional_columns if col in df1_combined.columns])
-        df1_unique = df1_combined[display_columns].drop_duplicates(subset=['업체명', '상품명'])
-        
-        # 회차별 상세정보에서 업체명, 상품명, 회차번호 기준으로 중복 제거
-        if '회차' in df2_combined.columns:
-            df2_unique = df2_combined.drop_duplicates(subset=['업체명', '상품명', '회차'])
-        else:
-            # 회차 컬럼이 없는 경우 모든 컬럼으로 중복 제거
-            df2_unique = df2_combined.drop_duplicates()
-        
-        # 업체명 리스트 생성
-        company_list = df1_unique['업체명'].unique()
+        df1_unique = df1_combined[display_columns]
         
-        # 업체 선택 옵션 (라디오 버튼 사용)
-        selected_company = st.radio(
-            "업체 선택", 
-            options=company_list,
-            index=0 if len(company_list) > 0 else None,
-            key='company_selector',
-            horizontal=True  # 수평으로 배치
+        # 회차별 상세정보는 업체명, 상품명, 회차번호 기준 (회차 컬럼이 없으면 모든 컬럼 기준)으로 병합됨
+        df2_unique = df2_combined
+
+        # 전체 회차별 상세정보를 한 번에 정리하고 (업체명, 상품명) 그룹 인덱스와 상품 검색 색인을 만듦
+        # 병합 데이터가 바뀌었을 때만 새로 만들고, 같은 병합 데이터를 쓰는 다른 세션이 만든 것은 그대로 사용
+        # (저장소에서 불러온 그대로라면 일괄 수집 때 미리 정리해 둔 회차 내역 사용)
+        data_key = merged.version
+        normalized = merged.data.derived(
+            'normalized', lambda: process_repayment_data(df2_unique, key_columns=GROUP_KEYS)
         )
-        
-        st.session_state.selected_company = selected_company
-        
-        if st.session_state.selected_company:
-            st.subheader(f"{st.session_state.selected_company} 투자 상품")
-            
-            # 선택된 업체의 상품 필터링
-            df1_selected = df1_unique[df1_unique['업체명'] == st.session_state.selected_company]
-            
-            for _, row in df1_selected.iterrows():
-                product = row['상품명']
-                
-                # 투자계약일과 상품유형 정보 추가
-                display_info = f"{product}"
-                
-                if '투자계약일' in row and pd.notna(row['투자계약일']):
-                    contract_date = row['투자계약일']
-                    if isinstance(contract_date, pd.Timestamp):
-                        contract_date = contract_date.strftime('%Y-%m-%d')
-                    display_info += f" | 계약일: {contract_date}"
-                
-                if '상품유형' in row and pd.notna(row['상품유형']):
-                    display_info += f" | 유형: {row['상품유형']}"
-                
-                with st.expander(display_info):
-                    # 두 번째 시트에서 업체명과 상품명 기준으로 필터링하여 회차 내역 표시
-                    df_product_details = df2_unique[
-                        (df2_unique['상품명'] == product) & 
-                        (df2_unique['업체명'] == st.session_state.selected_company)
-                    ]
-                    
-                    if not df_product_details.empty:
-                        # 데이터 처리
-                        processed_df = process_repayment_data(df_product_details)
-                        
-                        # '회차' 열을 첫 번째 열로 이동 (있을 경우)
-                        if '회차' in processed_df.columns:
-                            회차_column = processed_df['회차']
-                            processed_df = processed_df.drop(columns=['회차'])
-                            processed_df.insert(0, '회차', 회차_column)
-                        
-                        # 인덱스 숨기기 (hide_index=True)
-                        st.dataframe(processed_df, hide_index=True)
-                    else:
-                        st.info(f"'{product}' 상품의 회차 정보가 없습니다.")
-    else:
+        repayment_index = merged.data.derived('repayment_index', lambda: GroupIndex(normalized))
+        product_search = merged.data.derived('product_search', lambda: ProductSearch(df1_unique, normalized))
+        timer.lap("인덱스")
+
+        # 병합 결과를 파일로 내보내기 (엑셀/CSV/Parquet)
+        show_export(df1_unique, df2_unique, data_key, normalized=repayment_index.df)
+
+        # 전체 업체/상품 검색
+        show_search(product_search)
+
+        # 업체/상품 화면은 조각으로 분리해 업체 선택이나 상품 펼치기 때 이 부분만 다시 실행
+        show_products(df1_unique, repayment_index)
+    elif job is None or job.exhausted:
         st.warning("처리할 데이터가 없습니다. 유효한 엑셀 파일을 업로드하세요.")
 else:
     st.info("P2P 투자 내역이 포함된 엑셀 파일을 업로드하세요.")
+
+timer.lap("표시")
+finish_rerun(timer)
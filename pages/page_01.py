@@ -1,9 +1,35 @@
 import streamlit as st
 import pandas as pd
 
+from utils.db import portfolio_db_path, save_entries
+from utils.portfolio import current_portfolio
+from utils.schedule import REPAYMENT_FIELDS, apply_grid_changes, generate_installments, new_repayment_row, repayment_frame
+
 # 페이지 설정
 st.set_page_config(page_title="펀딩보드", layout="wide")
 
+# 입력한 내역을 저장할 포트폴리오의 로컬 DB
+db_path = portfolio_db_path(current_portfolio())
+
+# 표 편집 모드에서 사용할 컬럼 설정
+REPAYMENT_COLUMN_CONFIG = {
+    "회차": st.column_config.NumberColumn("회차", min_value=1, step=1),
+    "지급예정일": st.column_config.DateColumn("지급예정일"),
+    "원금": st.column_config.NumberColumn("원금", min_value=0, step=10000),
+    "이자": st.column_config.NumberColumn("이자", min_value=0, step=10),
+    "세금": st.column_config.NumberColumn("세금", min_value=0, step=10),
+    "수수료": st.column_config.NumberColumn("수수료", min_value=0, step=10),
+    "상환완료": st.column_config.CheckboxColumn("완료"),
+}
+
+
+# 표 편집 모드에서 아직 저장하지 않은 변경분까지 반영한 새 회차 목록
+def pending_new_repayments():
+    changes = st.session_state.get("new_repayments_editor")
+    if st.session_state.get("grid_mode", True) and changes:
+        return apply_grid_changes(st.session_state.get("new_repayments", []), changes)
+    return st.session_state.get("new_repayments", [])
+
 # "이전 화면" 버튼 동작
 if st.button("🔙 이전 화면"):
     if "repayment_data" in st.session_state:
@@ -22,18 +48,20 @@ st.title("💰 회차별 상환 내역 입력")
 st.subheader("📊 투자 내역")
 
 if "investment_data" in st.session_state and not st.session_state["investment_data"].empty:
-    st.dataframe(st.session_state["investment_data"], hide_index=True)
+    st.dataframe(st.session_state["investment_data"].to_frame(), hide_index=True)
 else:
     st.warning("❌ 저장된 투자 내역이 없습니다. 먼저 투자 내역을 입력하세요.")
 
 # 저장된 회차별 상환 내역 표시
 if st.session_state.get("repayment_data"):
-    columns = ["회차", "지급예정일", "원금", "이자", "세금", "수수료", "상환완료"]
-    repayment_df = pd.DataFrame(st.session_state["repayment_data"], columns=columns)
+    repayment_df = pd.DataFrame(st.session_state["repayment_data"], columns=REPAYMENT_FIELDS)
     st.dataframe(repayment_df, hide_index=True)
 
 # 편집 모드 토글 버튼
 col1, col2, col3 = st.columns([1, 1, 1])
+with col1:
+    # 회차마다 위젯을 만드는 대신 하나의 표에서 편집
+    grid_mode = st.toggle("표 편집 모드", value=True, key="grid_mode")
 with col3:
     if st.session_state.get("repayment_data") and st.button("🪄 수정"):
         st.session_state["edit_mode"] = not st.session_state.get("edit_mode", False)
@@ -47,48 +75,74 @@ with col3:
 if st.session_state.get("edit_mode"):
     st.subheader("✏️ 회차별 상환 내역 수정")
 
-    indices_to_delete = []
+    if grid_mode:
+        # 하나의 표에서 수정/추가/삭제하고, 수정 완료 시 바뀐 행만 반영
+        st.data_editor(
+            repayment_frame(st.session_state["repayment_data"]),
+            key="edit_repayments_editor",
+            num_rows="dynamic",
+            hide_index=True,
+            column_config=REPAYMENT_COLUMN_CONFIG,
+        )
+
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col2:
+            if st.button("✔️ 수정 완료"):
+                st.session_state["repayment_data"] = apply_grid_changes(
+                    st.session_state["repayment_data"], st.session_state.get("edit_repayments_editor", {})
+                )
+                st.session_state.pop("edit_repayments_editor", None)
+                st.session_state["edit_mode"] = False
+                st.success("✅ 회차별 상환 내역이 수정되었습니다!")
+                st.rerun()
+        with col3:
+            if st.button("❌ 취소"):
+                st.session_state.pop("edit_repayments_editor", None)
+                st.session_state["edit_mode"] = False
+                st.rerun()
+    else:
+        indices_to_delete = []
+
+        for i, repayment in enumerate(st.session_state["edit_repayments"]):
+            col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([1, 2, 2, 2, 2, 2, 1, 1])
+            with col1:
+                repayment["회차"] = st.number_input(f"회차", min_value=1, step=1, key=f"edit_period_num_{i}", value=repayment["회차"])
+            with col2:
+                repayment["지급예정일"] = st.date_input("지급예정일", key=f"edit_due_date_{i}", value=repayment["지급예정일"])
+            with col3:
+                repayment["원금"] = st.number_input("원금", min_value=0, step=10000, key=f"edit_principal_{i}", value=repayment["원금"])
+            with col4:
+                repayment["이자"] = st.number_input("이자", min_value=0, step=10, key=f"edit_interest_{i}", value=repayment["이자"])
+            with col5:
+                repayment["세금"] = st.number_input("세금", min_value=0, step=10, key=f"edit_tax_{i}", value=repayment["세금"])
+            with col6:
+                repayment["수수료"] = st.number_input("수수료", min_value=0, step=10, key=f"edit_fee_{i}", value=repayment["수수료"])
+            with col7:
+                repayment["상환완료"] = st.checkbox("완료", key=f"edit_repayment_status_{i}", value=repayment["상환완료"])
+            with col8:
+                if st.button("🗑 삭제", key=f"delete_repayment_{i}"):
+                    indices_to_delete.append(i)
+
+        if indices_to_delete:
+            for idx in sorted(indices_to_delete, reverse=True):
+                del st.session_state["edit_repayments"][idx]
+            st.rerun()
 
-    for i, repayment in enumerate(st.session_state["edit_repayments"]):
-        col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([1, 2, 2, 2, 2, 2, 1, 1])
+        col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
-            repayment["회차"] = st.number_input(f"회차", min_value=1, step=1, key=f"edit_period_num_{i}", value=repayment["회차"])
+            if st.button("➕ 추가"):
+                st.session_state["edit_repayments"].append(new_repayment_row())
+                st.rerun()
         with col2:
-            repayment["지급예정일"] = st.date_input("지급예정일", key=f"edit_due_date_{i}", value=repayment["지급예정일"])
+            if st.button("✔️ 수정 완료"):
+                st.session_state["repayment_data"] = st.session_state["edit_repayments"].copy()
+                st.session_state["edit_mode"] = False
+                st.success("✅ 회차별 상환 내역이 수정되었습니다!")
+                st.rerun()
         with col3:
-            repayment["원금"] = st.number_input("원금", min_value=0, step=10000, key=f"edit_principal_{i}", value=repayment["원금"])
-        with col4:
-            repayment["이자"] = st.number_input("이자", min_value=0, step=10, key=f"edit_interest_{i}", value=repayment["이자"])
-        with col5:
-            repayment["세금"] = st.number_input("세금", min_value=0, step=10, key=f"edit_tax_{i}", value=repayment["세금"])
-        with col6:
-            repayment["수수료"] = st.number_input("수수료", min_value=0, step=10, key=f"edit_fee_{i}", value=repayment["수수료"])
-        with col7:
-            repayment["상환완료"] = st.checkbox("완료", key=f"edit_repayment_status_{i}", value=repayment["상환완료"])
-        with col8:
-            if st.button("🗑 삭제", key=f"delete_repayment_{i}"):
-                indices_to_delete.append(i)
-
-    if indices_to_delete:
-        for idx in sorted(indices_to_delete, reverse=True):
-            del st.session_state["edit_repayments"][idx]
-        st.rerun()
-
-    col1, col2, col3 = st.columns([1, 1, 1])
-    with col1:
-        if st.button("➕ 추가"):
-            st.session_state["edit_repayments"].append({"회차": 1, "지급예정일": None, "원금": 0, "이자": 0, "세금": 0, "수수료": 0, "상환완료": False})
-            st.rerun()
-    with col2:
-        if st.button("✔️ 수정 완료"):
-            st.session_state["repayment_data"] = st.session_state["edit_repayments"].copy()
-            st.session_state["edit_mode"] = False
-            st.success("✅ 회차별 상환 내역이 수정되었습니다!")
-            st.rerun()
-    with col3:
-        if st.button("❌ 취소"):
-            st.session_state["edit_mode"] = False
-            st.rerun()
+            if st.button("❌ 취소"):
+                st.session_state["edit_mode"] = False
+                st.rerun()
 
 # 편집 모드가 아닐 때만 새로운 회차 추가 인터페이스 표시
 if not st.session_state.get("edit_mode", False):
@@ -97,66 +151,105 @@ if not st.session_state.get("edit_mode", False):
     if "new_repayments" not in st.session_state:
         st.session_state["new_repayments"] = []
 
-    for i, repayment in enumerate(st.session_state["new_repayments"]):
-        col1, col2, col3, col4, col5, col6, col7 = st.columns([1, 2, 2, 2, 2, 2, 1])
+    # 투자금액, 수익률, 기간으로 전체 회차를 한 번에 생성
+    with st.expander("🧮 회차 일괄 생성"):
+        ledger = st.session_state.get("investment_data")
+        latest = ledger.to_records()[-1] if ledger is not None and not ledger.empty else None
+
+        gen_col1, gen_col2, gen_col3, gen_col4, gen_col5 = st.columns(5)
+        with gen_col1:
+            gen_amount = st.number_input("투자금액", min_value=0, step=10000, key="gen_amount",
+                                         value=int(latest["투자금액"]) if latest else 0)
+        with gen_col2:
+            gen_rate = st.number_input("수익률 (%)", min_value=0.0, step=0.1, key="gen_rate",
+                                       value=float(latest["수익률"]) if latest else 0.0)
+        with gen_col3:
+            gen_period = st.number_input("투자기간 (개월)", min_value=1, step=1, key="gen_period",
+                                         value=int(latest["투자기간"]) if latest else 1)
+        with gen_col4:
+            gen_start = st.date_input("투자일자", key="gen_start",
+                                      value=latest["투자일자"].date() if latest else "today")
+        with gen_col5:
+            gen_fee_rate = st.number_input("수수료율 (연 %)", min_value=0.0, step=0.1, key="gen_fee_rate")
+
+        st.caption("만기일시상환 기준 (매월 이자, 마지막 회차에 원금), 세금은 이자의 15.4%")
+        if st.button("생성"):
+            st.session_state["new_repayments"] = generate_installments(gen_amount, gen_rate, gen_period, gen_start, gen_fee_rate)
+            st.session_state.pop("new_repayments_editor", None)
+            st.rerun()
+
+    if grid_mode:
+        # 추가/삭제는 표 아래의 행 추가 버튼과 행 선택 후 삭제로 처리
+        st.data_editor(
+            repayment_frame(st.session_state["new_repayments"]),
+            key="new_repayments_editor",
+            num_rows="dynamic",
+            hide_index=True,
+            column_config=REPAYMENT_COLUMN_CONFIG,
+        )
+    else:
+        for i, repayment in enumerate(st.session_state["new_repayments"]):
+            col1, col2, col3, col4, col5, col6, col7 = st.columns([1, 2, 2, 2, 2, 2, 1])
+            with col1:
+                repayment["회차"] = st.number_input(f"회차", min_value=1, step=1, key=f"period_num_{i}", value=repayment["회차"])
+            with col2:
+                repayment["지급예정일"] = st.date_input("지급예정일", key=f"due_date_{i}", value=repayment["지급예정일"])
+            with col3:
+                repayment["원금"] = st.number_input("원금", min_value=0, step=10000, key=f"principal_{i}", value=repayment["원금"])
+            with col4:
+                repayment["이자"] = st.number_input("이자", min_value=0, step=10, key=f"interest_{i}", value=repayment["이자"])
+            with col5:
+                repayment["세금"] = st.number_input("세금", min_value=0, step=10, key=f"tax_{i}", value=repayment["세금"])
+            with col6:
+                repayment["수수료"] = st.number_input("수수료", min_value=0, step=10, key=f"fee_{i}", value=repayment["수수료"])
+            with col7:
+                repayment["상환완료"] = st.checkbox("완료", key=f"repayment_status_{i}", value=repayment["상환완료"])
+
+        col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
-            repayment["회차"] = st.number_input(f"회차", min_value=1, step=1, key=f"period_num_{i}", value=repayment["회차"])
-        with col2:
-            repayment["지급예정일"] = st.date_input("지급예정일", key=f"due_date_{i}", value=repayment["지급예정일"])
-        with col3:
-            repayment["원금"] = st.number_input("원금", min_value=0, step=10000, key=f"principal_{i}", value=repayment["원금"])
-        with col4:
-            repayment["이자"] = st.number_input("이자", min_value=0, step=10, key=f"interest_{i}", value=repayment["이자"])
-        with col5:
-            repayment["세금"] = st.number_input("세금", min_value=0, step=10, key=f"tax_{i}", value=repayment["세금"])
-        with col6:
-            repayment["수수료"] = st.number_input("수수료", min_value=0, step=10, key=f"fee_{i}", value=repayment["수수료"])
-        with col7:
-            repayment["상환완료"] = st.checkbox("완료", key=f"repayment_status_{i}", value=repayment["상환완료"])
-
-    col1, col2, col3 = st.columns([1, 1, 1])
-    with col1:
-        btn_col1, btn_col2 = st.columns([1, 1])  # 내부에서 다시 컬럼 생성
-
-        with btn_col1:
-            if st.button("➕ 추가"):
-                new_repayment = {"회차": len(st.session_state["new_repayments"]) + 1, "지급예정일": None, "원금": 0, "이자": 0, "세금": 0, "수수료": 0, "상환완료": False}
-                st.session_state["new_repayments"].append(new_repayment)
-                st.rerun()
-        with btn_col2:
-            if st.button("➖ 삭제") and st.session_state["new_repayments"]:
-                st.session_state["new_repayments"].pop()
-                st.rerun()
+            btn_col1, btn_col2 = st.columns([1, 1])  # 내부에서 다시 컬럼 생성
+
+            with btn_col1:
+                if st.button("➕ 추가"):
+                    new_repayment = new_repayment_row(len(st.session_state["new_repayments"]) + 1)
+                    st.session_state["new_repayments"].append(new_repayment)
+                    st.rerun()
+            with btn_col2:
+                if st.button("➖ 삭제") and st.session_state["new_repayments"]:
+                    st.session_state["new_repayments"].pop()
+                    st.rerun()
             
     save_col1, save_col2, save_col3 = st.columns([1, 1, 1])
     with save_col1:
         if st.button("💾 저장"):
-            st.session_state["repayment_data"].extend(st.session_state["new_repayments"])
+            st.session_state["repayment_data"].extend(pending_new_repayments())
             st.session_state["new_repayments"] = []
+            st.session_state.pop("new_repayments_editor", None)
             st.success("ℹ️ 상세 내역이 저장되었습니다!")
             st.rerun()
 
     with save_col3:
         if st.button("📊 대시보드로 이동"):
             # ✅ 기존 데이터(rep)와 새로 입력한 데이터(new)를 합쳐서 저장
-            st.session_state["dashboard_repayments"] = (
-                st.session_state.get("repayment_data", []).copy() + 
-                st.session_state.get("new_repayments", []).copy()
+            repayments = (
+                st.session_state.get("repayment_data", []) + 
+                pending_new_repayments()
             )
             
-            # investment_data도 dashboard_investments 이름으로 복사하여 저장
-            if "investment_data" in st.session_state:
-                # 데이터프레임을 딕셔너리 리스트로 변환하여 저장
-                st.session_state["dashboard_investments"] = st.session_state["investment_data"].to_dict('records')
+            # 투자 내역과 함께 로컬 DB 에 저장 (새로고침해도 대시보드에 유지됨)
+            investments = st.session_state["investment_data"].to_records() if "investment_data" in st.session_state else []
+            try:
+                save_entries(investments, repayments, db_path=db_path)
+            except ValueError as e:
+                # 입력한 회차별 내역은 그대로 두고 이동하지 않음
+                st.error(str(e))
             else:
-                st.session_state["dashboard_investments"] = []
-
-            # 화면에 작성되었던 데이터 삭제
-            if "repayment_data" in st.session_state:
-                del st.session_state["repayment_data"]
-            if "new_repayments" in st.session_state:
-                del st.session_state["new_repayments"]
-            if "investment_data" in st.session_state:
-                del st.session_state["investment_data"]
-            
-            st.switch_page("pages/page_02.py")
+                # 화면에 작성되었던 데이터 삭제
+                if "repayment_data" in st.session_state:
+                    del st.session_state["repayment_data"]
+                if "new_repayments" in st.session_state:
+                    del st.session_state["new_repayments"]
+                if "investment_data" in st.session_state:
+                    del st.session_state["investment_data"]
+
+                st.switch_page("pages/page_02.py")
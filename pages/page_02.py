@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime, timedelta
 
+from utils.aggregates import dashboard_data
+from utils.charts import BUCKETS, bucket_detail, bucket_detail_figure
+from utils.db import data_version, portfolio_db_path
+from utils.portfolio import current_portfolio
+from utils.profiling import finish_rerun, start_rerun
+
 # 페이지 설정
 st.set_page_config(page_title="P2P 투자 대시보드", layout="wide")
 
+# 재실행 단계별 소요 시간 기록 (사이드바에서 표시/프로파일링 선택)
+timer = start_rerun("page_02")
+
 # 메인 화면으로 돌아가기 버튼
 if st.button("🔙 메인 화면으로 돌아가기"):
     st.switch_page("app.py")
@@ -15,117 +23,131 @@ if st.button("🔙 메인 화면으로 돌아가기"):
 # 대시보드 상단 통계 섹션
 st.title("📊 P2P 투자 대시보드")
 
-# 필요한 데이터 확인
-if "dashboard_repayments" not in st.session_state or not st.session_state["dashboard_repayments"]:
+# 필요한 데이터 확인 (로컬 DB 의 데이터 버전이 바뀐 경우에만 다시 집계)
+# 이 세션의 포트폴리오 DB 만 집계
+timer.lap("준비")
+db_path = portfolio_db_path(current_portfolio())
+st.caption(f"포트폴리오: {st.session_state.portfolio}")
+dashboard = dashboard_data(data_version(db_path), pd.Timestamp.today().normalize(), db_path)
+timer.lap("집계", rows=dashboard["repayment_count"])
+if dashboard["repayment_count"] == 0:
     st.info("📝 상환 내역이 없습니다. 먼저 상환 내역을 입력해주세요.")
-elif "dashboard_investments" not in st.session_state or not st.session_state["dashboard_investments"]:
+elif dashboard["investment_count"] == 0:
     st.info("📝 투자 내역이 없습니다. 먼저 투자 내역을 입력해주세요.")
 else:
-    # 투자 데이터 로드
-    investment_df = pd.DataFrame(st.session_state["dashboard_investments"])
+    # 표시용 투자/상환 데이터
+    investment_df = dashboard["investments"]
+    repayment_df = dashboard["repayments"]
     
-    # 상환 데이터 처리
-    repayment_data = st.session_state["dashboard_repayments"]
-    repayment_df = pd.DataFrame(repayment_data)
+    # 상단 통계 카드 (SQL 로 집계)
+    summary = dashboard["investment_summary"]
+    total_investment = summary["total_investment"]
+    avg_interest_rate = summary["avg_interest_rate"]
+    active_investments = summary["active_investments"]
+    completed_investments = summary["completed_investments"]
     
-    # 상단 통계 카드 (investment_df에서 가져옴)
-    if "투자금액" in investment_df.columns:
-        total_investment = investment_df["투자금액"].sum()
-    else:
-        total_investment = 0
-        
-    if "수익률" in investment_df.columns:
-        avg_interest_rate = investment_df["수익률"].mean()
-    else:
-        avg_interest_rate = 0
-        
-    if "상품상태" in investment_df.columns:
-        active_investments = investment_df[investment_df["상품상태"] == "투자중"].shape[0]
-        completed_investments = investment_df[investment_df["상품상태"] == "상환완료"].shape[0]
-    else:
-        active_investments = 0
-        completed_investments = 0
+    portfolio_yield = dashboard["portfolio_yield"]
     
     st.subheader("요약")
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
         st.metric("총 투자금액", f"{total_investment:,}원")
     with col2:
         st.metric("평균 수익률", f"{avg_interest_rate:.2f}%")
     with col3:
-        st.metric("투자 중인 상품", f"{active_investments}개")
+        st.metric("실효 수익률 (XIRR)", "-" if pd.isna(portfolio_yield) else f"{portfolio_yield:.2f}%",
+                  help="투자금액, 상환 시점, 세금, 수수료를 반영한 연 수익률 (남은 원금은 오늘 기준 원금으로 평가)")
     with col4:
+        st.metric("투자 중인 상품", f"{active_investments}개")
+    with col5:
         st.metric("상환 완료 상품", f"{completed_investments}개")
     
     # 투자 현황 탭
     st.subheader("투자 현황")
-    tab1, tab2 = st.tabs(["투자 내역", "상환 내역"])
+    tab1, tab2, tab3 = st.tabs(["투자 내역", "상환 내역", "현금흐름 예측"])
     
     with tab1:
         st.dataframe(investment_df, use_container_width=True)
+        
+        # 상품별 약정 수익률과 실제 현금흐름 기준 실효 수익률 비교
+        st.subheader("상품별 실효 수익률")
+        st.dataframe(
+            dashboard["product_yields"],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "약정 수익률": st.column_config.NumberColumn(format="%.2f%%"),
+                "실효 수익률": st.column_config.NumberColumn(format="%.2f%%"),
+            }
+        )
     
     with tab2:
         st.subheader("회차별 상환 내역")
         st.dataframe(repayment_df, use_container_width=True)
         
-        # 상환 완료된 항목 수
-        if "상환완료" in repayment_df.columns:
-            completed_repayments = repayment_df["상환완료"].sum()
-            total_repayments = len(repayment_df)
-            
-            # 총 상환 금액 계산
-            completed_df = repayment_df[repayment_df["상환완료"]]
-            total_principal = completed_df["원금"].sum() if "원금" in completed_df.columns else 0
-            total_interest = completed_df["이자"].sum() if "이자" in completed_df.columns else 0
-            total_tax = completed_df["세금"].sum() if "세금" in completed_df.columns else 0
-            total_fee = completed_df["수수료"].sum() if "수수료" in completed_df.columns else 0
-            
-            # 상환 내역 요약
-            st.subheader("상환 내역 요약")
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("상환 진행률", f"{completed_repayments}/{total_repayments}")
-            with col2:
-                st.metric("총 상환 원금", f"{total_principal:,}원")
-            with col3:
-                st.metric("총 이자 수익", f"{total_interest:,}원")
-            with col4:
-                net_interest = total_interest - total_tax - total_fee
-                st.metric("순 이자 수익", f"{net_interest:,}원")
-        
-        # 상환 차트: 회차별 원금 및 이자 차트
-        if not repayment_df.empty and "회차" in repayment_df.columns and "원금" in repayment_df.columns and "이자" in repayment_df.columns:
-            fig_payment = px.bar(
-                repayment_df.sort_values("회차"), 
-                x="회차", 
-                y=["원금", "이자"],
-                title="회차별 원금 및 이자",
-                barmode="group"
-            )
-            st.plotly_chart(fig_payment, use_container_width=True)
-            
-    # 조건부 탭3: 투자 데이터에 필요한 컬럼이 있는 경우에만 표시
-    if (("서비스명" in investment_df.columns) and 
-        ("투자금액" in investment_df.columns) and
-        len(investment_df) > 0):
+        # 상환 완료된 회차 기준 합계 (SQL 로 집계)
+        repayment_totals = dashboard["repayment_summary"]
+        completed_repayments = repayment_totals["completed_repayments"]
+        total_repayments = repayment_totals["total_repayments"]
+        total_principal = repayment_totals["total_principal"]
+        total_interest = repayment_totals["total_interest"]
+        total_tax = repayment_totals["total_tax"]
+        total_fee = repayment_totals["total_fee"]
         
-        st.subheader("통계 분석")
+        # 상환 내역 요약
+        st.subheader("상환 내역 요약")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("상환 진행률", f"{completed_repayments}/{total_repayments}")
+        with col2:
+            st.metric("총 상환 원금", f"{total_principal:,}원")
+        with col3:
+            st.metric("총 이자 수익", f"{total_interest:,}원")
+        with col4:
+            net_interest = total_interest - total_tax - total_fee
+            st.metric("순 이자 수익", f"{net_interest:,}원")
         
-        # 플랫폼별 투자 금액 시각화
-        platform_data = investment_df.groupby("서비스명")["투자금액"].sum().reset_index()
+        # 상환 차트: 회차 또는 월 단위로 묶은 원금 및 이자 차트
+        bucket = st.radio("집계 단위", BUCKETS, horizontal=True, key="payment_bucket")
+        st.plotly_chart(dashboard["figures"]["payment"][bucket], use_container_width=True)
         
-        # 파이 차트 
-        fig1 = px.pie(platform_data, values="투자금액", names="서비스명", 
-                    title="플랫폼별 투자 비중",
-                    hole=0.3)
-        st.plotly_chart(fig1, use_container_width=True)
+        # 선택한 구간의 상환 내역만 상세 표시
+        bucket_values = dashboard["payment_buckets"][bucket][bucket].tolist()
+        selected_bucket = st.selectbox(
+            "구간 상세 보기",
+            options=[None] + bucket_values,
+            format_func=lambda value: "선택 안 함" if value is None else (
+                value.strftime("%Y-%m") if bucket == "월" else f"{value}회차"
+            ),
+            key=f"payment_bucket_detail_{bucket}"
+        )
+        if selected_bucket is not None:
+            detail_df = bucket_detail(repayment_df, bucket, selected_bucket)
+            st.dataframe(detail_df, hide_index=True, use_container_width=True)
+            st.plotly_chart(bucket_detail_figure(detail_df, "상품별 원금 및 이자"), use_container_width=True)
+    
+    with tab3:
+        # 투자금액, 수익률, 기간으로 계산한 만기일시상환 기준 예상 수익과 상환 완료된 실제 수익 비교
+        st.subheader("월별 예상 vs 실현 순이자")
+        cash_flow = dashboard["cash_flow"]
         
-        # 기타 차트는 필요한 컬럼이 있는 경우에만 표시
-        if "상품상태" in investment_df.columns:
-            status_data = investment_df.groupby("상품상태")["투자금액"].sum().reset_index()
-            fig2 = px.bar(status_data, x="상품상태", y="투자금액", 
-                        title="상태별 투자 금액",
-                        color="상품상태", text_auto=True)
-            st.plotly_chart(fig2, use_container_width=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("예상 순이자 합계", f"{cash_flow['예상 순이자'].sum():,}원")
+        with col2:
+            st.metric("실현 순이자 합계", f"{cash_flow['실현 순이자'].sum():,}원")
         
-        # 이하 다른 차트들도 비슷하게 조건부로 표시
+        st.plotly_chart(dashboard["figures"]["cash_flow"], use_container_width=True)
+        st.dataframe(cash_flow, hide_index=True, use_container_width=True)
+            
+    # 통계 분석: 플랫폼별 비중과 상태별 투자 금액
+    st.subheader("통계 분석")
+    
+    # 파이 차트 
+    st.plotly_chart(dashboard["figures"]["platform"], use_container_width=True)
+    st.plotly_chart(dashboard["figures"]["status"], use_container_width=True)
+    
+    # 이하 다른 차트들도 비슷하게 조건부로 표시
+
+timer.lap("표시")
+finish_rerun(timer)
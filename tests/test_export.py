@@ -0,0 +1,44 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from utils.dtypes import compact_frame
+from utils.export import write_parquet
+
+
+def _portfolio():
+    # A펀딩 내보내기 파일에는 상품유형 컬럼이 없어서 병합 후 A 의 상품유형은 모두 빈 값
+    df1 = pd.DataFrame({
+        '업체명': ['A펀딩', 'B펀딩'],
+        '상품명': ['A 제1호', 'B 제1호'],
+        '투자계약일': pd.to_datetime(['2024-01-01', '2024-02-01']),
+        '상품유형': pd.Series([None, '개인 신용'], dtype=object),
+    })
+    normalized = pd.DataFrame({
+        '업체명': ['A펀딩', 'A펀딩', 'B펀딩'],
+        '상품명': ['A 제1호', 'A 제1호', 'B 제1호'],
+        '회차': [1, 2, 1],
+        '지급일': pd.to_datetime(['2024-02-01', '2024-03-01', '2024-03-01']),
+        '지급원금': [0, 10000, 50000],
+        '지급이자': [100, 100, 500],
+        '연체이자': [0, 0, 0],
+        '수수료': [0, 0, 10],
+        '실제지급액': [85, 10085, 50413],
+    })
+    return df1, normalized
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_write_parquet_column_empty_for_first_platform(tmp_path, compact):
+    df1, normalized = _portfolio()
+    if compact:
+        df1, normalized = compact_frame(df1), compact_frame(normalized)
+    path = tmp_path / 'portfolio.parquet'
+
+    write_parquet(str(path), df1, normalized)
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.num_row_groups == 2
+    table = parquet.read()
+    assert table.column('상품유형').to_pylist() == [None, None, '개인 신용']
+    assert table.column('실제지급액').to_pylist() == [85, 10085, 50413]
@@ -0,0 +1,131 @@
+import pandas as pd
+
+from utils.group_index import GroupIndex
+from utils.merge import DETAIL_KEYS, MergedData, MergedTable, PortfolioMerge
+from utils.merge_cache import SharedMergeCache
+
+
+def _detail(rounds, amount, product='A 제1호'):
+    return pd.DataFrame({
+        '업체명': ['A펀딩'] * len(rounds),
+        '상품명': [product] * len(rounds),
+        '회차': rounds,
+        '지급이자(원)': [amount] * len(rounds),
+    })
+
+
+def test_upsert_later_file_replaces_rows():
+    table = MergedTable(DETAIL_KEYS)
+    table.upsert(_detail([1, 2, 3, 4, 5, 6], 100))
+    table.upsert(_detail([4, 5, 6], 200))
+
+    frame = table.frame()
+    assert len(table) == 6
+    assert frame['회차'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert frame.set_index('회차')['지급이자(원)'].to_dict() == {1: 100, 2: 100, 3: 100, 4: 200, 5: 200, 6: 200}
+
+
+def test_upsert_keeps_first_row_within_one_file():
+    table = MergedTable(DETAIL_KEYS)
+    df = _detail([1, 2, 1], 100)
+    df.loc[2, '지급이자(원)'] = 999
+    table.upsert(df)
+
+    frame = table.frame()
+    assert frame['회차'].tolist() == [1, 2]
+    assert frame['지급이자(원)'].tolist() == [100, 100]
+
+
+def test_upsert_without_round_column_uses_all_columns():
+    table = MergedTable(DETAIL_KEYS)
+    df = _detail([1, 2], 100).drop(columns=['회차'])
+    df.loc[1, '지급이자(원)'] = 200
+    table.upsert(df)
+    table.upsert(df.iloc[[0]])
+    table.upsert(df.assign(**{'지급이자(원)': 300}).iloc[[0]])
+
+    frame = table.frame()
+    assert len(frame) == 3
+    assert sorted(frame['지급이자(원)'].tolist()) == [100, 200, 300]
+
+
+def test_upsert_after_frame_keeps_replacing():
+    table = MergedTable(DETAIL_KEYS)
+    table.upsert(_detail([1, 2], 100))
+    table.frame()
+    table.upsert(_detail([2], 200))
+
+    assert table.frame().set_index('회차')['지급이자(원)'].to_dict() == {1: 100, 2: 200}
+
+
+def test_group_index_returns_rounds_in_order_after_replacement():
+    table = MergedTable(DETAIL_KEYS)
+    table.upsert(_detail([1, 2, 3, 4, 5, 6], 100))
+    table.upsert(_detail([1, 2, 3], 200))
+
+    rows = GroupIndex(table.frame()).get('A펀딩', 'A 제1호')
+    assert rows['회차'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert rows['지급이자(원)'].tolist() == [200, 200, 200, 100, 100, 100]
+
+
+def _main(products):
+    return pd.DataFrame({'업체명': ['A펀딩'] * len(products), '상품명': products})
+
+
+def test_rebased_keeps_rows_saved_after_loading():
+    merged = PortfolioMerge()
+    merged.add(_main(['A 제1호']), _detail([1, 2], 100), from_store=True)
+    merged.add(_main(['A 제2호']), _detail([1], 300, product='A 제2호'))
+    merged.add(_main(['A 제1호']), _detail([2], 200))
+
+    # 불러온 뒤에 다른 세션이 A 제3호를 저장하고 A 제1호 1회차를 바꾼 저장소
+    stored = (
+        _main(['A 제1호', 'A 제3호']),
+        pd.concat([_detail([1, 2], 150), _detail([1], 500, product='A 제3호')], ignore_index=True),
+    )
+    rebased = merged.rebased(stored)
+
+    assert sorted(rebased.main.frame()['상품명'].tolist()) == ['A 제1호', 'A 제2호', 'A 제3호']
+    detail = rebased.detail.frame().set_index(['상품명', '회차'])['지급이자(원)'].to_dict()
+    assert detail == {('A 제1호', 1): 150, ('A 제1호', 2): 200, ('A 제3호', 1): 500, ('A 제2호', 1): 300}
+
+
+def test_rebased_keeps_rows_of_files_without_round_column():
+    merged = PortfolioMerge()
+    merged.add(_main(['A 제1호']), _detail([1], 100))
+    merged.add(_main(['A 제1호']), _detail([1, 2], 100).drop(columns=['회차']).assign(**{'지급이자(원)': [10, 20]}))
+
+    rebased = merged.rebased(None)
+
+    assert len(rebased.detail) == 3
+    assert sorted(rebased.detail.frame()['지급이자(원)'].tolist()) == [10, 20, 100]
+
+
+def test_sessions_adding_same_files_share_merged_data():
+    cache = SharedMergeCache()
+    first = PortfolioMerge(MergedData(), cache, ('store', None))
+    second = PortfolioMerge(MergedData(), cache, ('store', None))
+
+    first.add(_main(['A 제1호']), _detail([1, 2], 100), digest='a')
+    first.share()
+    second.add(_main(['A 제1호']), _detail([1, 2], 100), digest='a')
+
+    assert second.data is first.data
+    built = []
+    first.data.derived('index', lambda: built.append(1) or GroupIndex(first.detail.frame()))
+    second.data.derived('index', lambda: built.append(2) or GroupIndex(second.detail.frame()))
+    assert built == [1]
+
+
+def test_adding_to_shared_data_leaves_it_unchanged():
+    cache = SharedMergeCache()
+    first = PortfolioMerge(MergedData(), cache, ('store', None))
+    first.add(_main(['A 제1호']), _detail([1, 2], 100), digest='a')
+    first.share()
+    second = PortfolioMerge(first.data, cache, first.key)
+
+    second.add(_main(['A 제1호']), _detail([2], 200), digest='b')
+
+    assert second.data is not first.data
+    assert first.detail.frame()['지급이자(원)'].tolist() == [100, 100]
+    assert second.detail.frame().set_index('회차')['지급이자(원)'].to_dict() == {1: 100, 2: 200}
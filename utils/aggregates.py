@@ -0,0 +1,67 @@
+import plotly.express as px
+import streamlit as st
+
+from utils.charts import BUCKETS, bucket_repayments, payment_figure
+from utils.projection import projected_vs_realized
+from utils.xirr import realized_yields
+from utils.db import (DB_PATH, count_rows, investment_summary, load_investments, load_repayments, platform_totals,
+                      repayment_summary, status_totals)
+
+
+# 대시보드에 필요한 표, 요약 통계, 차트 스펙을 데이터 버전별로 한 번만 계산
+# 탭 전환 등으로 재실행되어도 버전이 같으면 캐시된 결과를 그대로 사용
+# as_of: 실효 수익률 계산 시 남은 원금을 평가하는 기준일
+@st.cache_data(max_entries=8, show_spinner=False)
+def dashboard_data(version, as_of, db_path=DB_PATH):
+    investment_count, repayment_count = count_rows(db_path)
+    data = {
+        "version": version,
+        "investment_count": investment_count,
+        "repayment_count": repayment_count,
+    }
+    if investment_count == 0 or repayment_count == 0:
+        return data
+
+    investment_df = load_investments(db_path)
+    repayment_df = load_repayments(db_path)
+    platform_data = platform_totals(db_path)
+    status_data = status_totals(db_path)
+
+    data.update({
+        "investments": investment_df.drop(columns=["id"]),
+        "repayments": repayment_df.drop(columns=["investment_id"]),
+        "investment_summary": investment_summary(db_path),
+        "repayment_summary": repayment_summary(db_path),
+        "platform_totals": platform_data,
+        "status_totals": status_data,
+    })
+
+    # 상환 차트는 집계 단위별로 미리 묶어 둠
+    payment_buckets = {bucket: bucket_repayments(repayment_df, bucket) for bucket in BUCKETS}
+    data["payment_buckets"] = payment_buckets
+
+    # 투자 조건으로 계산한 월별 예상 순이자와 실제 상환된 순이자
+    cash_flow = projected_vs_realized(investment_df, repayment_df)
+    data["cash_flow"] = cash_flow
+
+    # 금액, 시점, 세금, 수수료를 반영한 상품별/전체 실효 수익률 (XIRR)
+    product_yields, portfolio_yield = realized_yields(investment_df, repayment_df, as_of)
+    data["product_yields"] = product_yields
+    data["portfolio_yield"] = portfolio_yield
+
+    # 차트는 Figure 대신 직렬화된 스펙(dict)으로 보관
+    fig_platform = px.pie(platform_data, values="투자금액", names="서비스명",
+                          title="플랫폼별 투자 비중",
+                          hole=0.3)
+    fig_status = px.bar(status_data, x="상품상태", y="투자금액",
+                        title="상태별 투자 금액",
+                        color="상품상태", text_auto=True)
+    data["figures"] = {
+        "payment": {bucket: payment_figure(payment_buckets[bucket], bucket) for bucket in BUCKETS},
+        "platform": fig_platform.to_dict(),
+        "status": fig_status.to_dict(),
+        "cash_flow": px.bar(cash_flow, x="월", y=["예상 순이자", "실현 순이자"],
+                            title="월별 예상 vs 실현 순이자", barmode="group").to_dict(),
+    }
+
+    return data
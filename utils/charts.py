@@ -0,0 +1,38 @@
+import plotly.express as px
+
+# 차트 집계 단위 (회차별 또는 지급예정일 기준 월별)
+BUCKETS = ["회차", "월"]
+
+
+def bucket_keys(repayment_df, bucket):
+    if bucket == "월":
+        return repayment_df["지급예정일"].dt.to_period("M").dt.to_timestamp().rename("월")
+    return repayment_df["회차"]
+
+
+# 상환 내역을 집계 단위별 원금/이자 합계로 미리 묶음 (브라우저에는 구간 수만큼만 전송)
+def bucket_repayments(repayment_df, bucket):
+    keys = bucket_keys(repayment_df, bucket)
+    grouped = repayment_df.groupby(keys).agg(원금=("원금", "sum"), 이자=("이자", "sum"), 건수=("원금", "size"))
+    return grouped.reset_index()
+
+
+# 이미 구간별로 묶은 데이터만 그리므로 막대 수는 회차 수 또는 개월 수 정도로 작음
+def amount_figure(df, x, title):
+    return px.bar(df, x=x, y=["원금", "이자"], title=title, barmode="group")
+
+
+# 집계 단위별 차트 스펙
+def payment_figure(bucketed, bucket):
+    return amount_figure(bucketed, bucket, f"{bucket}별 원금 및 이자").to_dict()
+
+
+# 선택한 구간에 속한 상환 내역 (구간을 골랐을 때만 계산)
+def bucket_detail(repayment_df, bucket, value):
+    return repayment_df[bucket_keys(repayment_df, bucket) == value]
+
+
+# 선택한 구간 안에서 상품별 원금/이자
+def bucket_detail_figure(detail_df, title):
+    by_product = detail_df.groupby("상품명", sort=False)[["원금", "이자"]].sum().reset_index()
+    return amount_figure(by_product, "상품명", title)
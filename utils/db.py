@@ -0,0 +1,208 @@
+import os
+import secrets
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from utils.store import STORE_DIR, portfolio_dir
+
+DB_FILE = 'fundingboard.db'
+# 기본 포트폴리오의 DB (다른 포트폴리오는 portfolio_db_path 로 각자의 저장소 디렉터리에 둠)
+DB_PATH = os.path.join(STORE_DIR, DB_FILE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS investments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform TEXT NOT NULL,
+    product TEXT NOT NULL,
+    status TEXT NOT NULL,
+    invest_date TEXT,
+    amount INTEGER NOT NULL DEFAULT 0,
+    rate REAL NOT NULL DEFAULT 0,
+    period INTEGER NOT NULL DEFAULT 1,
+    loan_type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_investments_platform ON investments (platform);
+CREATE INDEX IF NOT EXISTS idx_investments_product ON investments (product);
+CREATE INDEX IF NOT EXISTS idx_investments_status ON investments (status);
+
+CREATE TABLE IF NOT EXISTS repayments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    investment_id INTEGER NOT NULL REFERENCES investments (id) ON DELETE CASCADE,
+    round INTEGER NOT NULL,
+    due_date TEXT,
+    principal INTEGER NOT NULL DEFAULT 0,
+    interest INTEGER NOT NULL DEFAULT 0,
+    tax INTEGER NOT NULL DEFAULT 0,
+    fee INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_repayments_investment ON repayments (investment_id);
+CREATE INDEX IF NOT EXISTS idx_repayments_due_date ON repayments (due_date);
+CREATE INDEX IF NOT EXISTS idx_repayments_completed ON repayments (completed);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# 화면에 표시할 한글 컬럼명
+INVESTMENT_SELECT = """
+SELECT id, platform AS 서비스명, product AS 상품명, status AS 상품상태, invest_date AS 투자일자,
+       amount AS 투자금액, rate AS 수익률, period AS 투자기간, loan_type AS 대출유형
+FROM investments
+"""
+REPAYMENT_SELECT = """
+SELECT r.investment_id, i.platform AS 서비스명, i.product AS 상품명, r.round AS 회차, r.due_date AS 지급예정일,
+       r.principal AS 원금, r.interest AS 이자, r.tax AS 세금, r.fee AS 수수료, r.completed AS 상환완료
+FROM repayments r JOIN investments i ON i.id = r.investment_id
+"""
+
+
+def portfolio_db_path(portfolio):
+    return os.path.join(portfolio_dir(portfolio), DB_FILE)
+
+
+def connect(db_path=DB_PATH):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    # DB 파일마다 임의의 id 를 한 번 기록 (파일을 지우고 다시 만들면 버전이 1부터 다시 시작하므로 캐시 키에 함께 사용)
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'db_id'").fetchone() is None:
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('db_id', ?)", (secrets.randbits(62),))
+    return conn
+
+
+def _date_text(value):
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).date().isoformat()
+
+
+# 투자 내역과 그 투자의 회차별 상환 내역을 한 트랜잭션으로 저장
+# 회차별 내역은 마지막에 입력된 투자(회차별 내역 입력 화면에서 작성 중인 투자)에 연결
+# 연결할 투자 없이 회차별 내역만 있으면 아무것도 저장하지 않고 ValueError
+def save_entries(investments, repayments, db_path=DB_PATH):
+    investments = list(investments)
+    if repayments and not investments:
+        raise ValueError("회차별 상환 내역을 연결할 투자 내역이 없습니다. 먼저 투자 내역을 입력하세요.")
+    with closing(connect(db_path)) as conn, conn:
+        investment_id = None
+        for entry in investments:
+            cursor = conn.execute(
+                "INSERT INTO investments (platform, product, status, invest_date, amount, rate, period, loan_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry["서비스명"], entry["상품명"], entry["상품상태"], _date_text(entry["투자일자"]),
+                    int(entry["투자금액"]), float(entry["수익률"]), int(entry["투자기간"]), entry["대출유형"],
+                ),
+            )
+            investment_id = cursor.lastrowid
+
+        if investment_id is None:
+            return investment_id
+
+        # 데이터가 바뀔 때마다 버전을 올려서 대시보드 집계 캐시를 갱신
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('data_version', 1) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+        )
+
+        if not repayments:
+            return investment_id
+
+        conn.executemany(
+            "INSERT INTO repayments (investment_id, round, due_date, principal, interest, tax, fee, completed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    investment_id, int(repayment["회차"]), _date_text(repayment["지급예정일"]),
+                    int(repayment["원금"]), int(repayment["이자"]), int(repayment["세금"]),
+                    int(repayment["수수료"]), int(bool(repayment["상환완료"])),
+                )
+                for repayment in repayments
+            ],
+        )
+        return investment_id
+
+
+def query(sql, params=(), db_path=DB_PATH):
+    with closing(connect(db_path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def load_investments(db_path=DB_PATH):
+    df = query(INVESTMENT_SELECT + " ORDER BY id", db_path=db_path)
+    df["투자일자"] = pd.to_datetime(df["투자일자"])
+    return df
+
+
+def load_repayments(db_path=DB_PATH):
+    df = query(REPAYMENT_SELECT + " ORDER BY r.investment_id, r.round", db_path=db_path)
+    df["지급예정일"] = pd.to_datetime(df["지급예정일"])
+    df["상환완료"] = df["상환완료"].astype(bool)
+    return df
+
+
+def fetch_one(sql, params=(), db_path=DB_PATH):
+    with closing(connect(db_path)) as conn:
+        conn.row_factory = sqlite3.Row
+        return dict(conn.execute(sql, params).fetchone())
+
+
+# 저장된 데이터의 버전 (DB id, 저장할 때마다 1씩 증가하는 번호 (아직 없으면 0))
+def data_version(db_path=DB_PATH):
+    with closing(connect(db_path)) as conn:
+        rows = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('db_id', 'data_version')").fetchall())
+    return rows['db_id'], rows.get('data_version', 0)
+
+
+def count_rows(db_path=DB_PATH):
+    with closing(connect(db_path)) as conn:
+        investments = conn.execute("SELECT COUNT(*) FROM investments").fetchone()[0]
+        repayments = conn.execute("SELECT COUNT(*) FROM repayments").fetchone()[0]
+    return investments, repayments
+
+
+# 상단 요약 통계 (총 투자금액, 평균 수익률, 상태별 상품 수)
+def investment_summary(db_path=DB_PATH):
+    return fetch_one("""
+        SELECT COALESCE(SUM(amount), 0) AS total_investment,
+               COALESCE(AVG(rate), 0) AS avg_interest_rate,
+               COUNT(CASE WHEN status = '투자중' THEN 1 END) AS active_investments,
+               COUNT(CASE WHEN status = '상환완료' THEN 1 END) AS completed_investments
+        FROM investments
+    """, db_path=db_path)
+
+
+# 상환 완료된 회차 기준 합계
+def repayment_summary(db_path=DB_PATH):
+    return fetch_one("""
+        SELECT COUNT(CASE WHEN completed = 1 THEN 1 END) AS completed_repayments,
+               COUNT(*) AS total_repayments,
+               COALESCE(SUM(CASE WHEN completed = 1 THEN principal END), 0) AS total_principal,
+               COALESCE(SUM(CASE WHEN completed = 1 THEN interest END), 0) AS total_interest,
+               COALESCE(SUM(CASE WHEN completed = 1 THEN tax END), 0) AS total_tax,
+               COALESCE(SUM(CASE WHEN completed = 1 THEN fee END), 0) AS total_fee
+        FROM repayments
+    """, db_path=db_path)
+
+
+# 플랫폼별 투자 금액
+def platform_totals(db_path=DB_PATH):
+    return query("""
+        SELECT platform AS 서비스명, SUM(amount) AS 투자금액
+        FROM investments GROUP BY platform ORDER BY platform
+    """, db_path=db_path)
+
+
+# 상품 상태별 투자 금액
+def status_totals(db_path=DB_PATH):
+    return query("""
+        SELECT status AS 상품상태, SUM(amount) AS 투자금액
+        FROM investments GROUP BY status ORDER BY status
+    """, db_path=db_path)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# 회차마다 같은 값이 반복되는 문자열 컬럼
+CATEGORY_COLUMNS = ['업체명', '상품명', '상품유형', '투자계약 구분', '파일명']
+# 날짜 컬럼 (문자열로 들어온 경우 datetime64 로 변환)
+DATE_COLUMNS = ['투자계약일', '지급일', '예정지급일', '실제 지급일']
+# 원 단위 금액 컬럼은 이름이 '(원)' 으로 끝남
+AMOUNT_SUFFIX = '(원)'
+ROUND_COLUMN = '회차'
+
+
+def _to_datetime(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    converted = pd.to_datetime(series, errors='coerce')
+    # 날짜로 읽을 수 없는 값이 있으면 원래 값을 보존
+    if converted.isna().sum() != series.isna().sum():
+        return series
+    return converted
+
+
+# 소수 부분이 없는 숫자 컬럼만 정수로 변환
+# 빈 값이 있는 컬럼(예정 회차의 실제 지급 금액 등)은 계산에 쓰기 쉽도록 float64 유지
+def _to_integer(series, dtype):
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.isna().any():
+        return series
+    numeric = pd.to_numeric(series, errors='coerce')
+    if numeric.isna().any() or not np.array_equal(numeric, np.floor(numeric)):
+        return series
+    if dtype == np.int16 and (numeric.min() < np.iinfo(np.int16).min or numeric.max() > np.iinfo(np.int16).max):
+        dtype = np.int32
+    return numeric.astype(dtype)
+
+
+# 병합 전에 파일 하나의 데이터프레임 컬럼 형식을 줄임 (이미 줄인 데이터프레임에 다시 적용해도 그대로)
+# 반복 문자열은 category, 원 단위 금액은 int64, 회차는 int16, 날짜는 datetime64
+def compact_frame(df):
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORY_COLUMNS and pd.api.types.is_string_dtype(series.dtype):
+            columns[col] = series.astype('category')
+        elif col in DATE_COLUMNS:
+            columns[col] = _to_datetime(series)
+        elif col == ROUND_COLUMN:
+            columns[col] = _to_integer(series, np.int16)
+        elif isinstance(col, str) and col.endswith(AMOUNT_SUFFIX):
+            columns[col] = _to_integer(series, np.int64)
+    if not columns:
+        return df
+    return df.assign(**columns)
+
+
+# 조각마다 category 값 목록이 달라도 category 형식을 유지한 채로 이어 붙임
+# (그냥 pd.concat 하면 값 목록이 다른 category 컬럼은 object 로 바뀜)
+def concat_frames(parts):
+    parts = list(parts)
+    if len(parts) > 1:
+        for col in parts[0].columns:
+            if not all(col in part.columns and isinstance(part[col].dtype, pd.CategoricalDtype) for part in parts):
+                continue
+            categories = union_categoricals([part[col].array for part in parts]).categories
+            dtype = pd.CategoricalDtype(categories)
+            parts = [part.assign(**{col: part[col].astype(dtype)}) for part in parts]
+    return pd.concat(parts, ignore_index=True)
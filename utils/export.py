@@ -0,0 +1,240 @@
+import os
+import re
+import tempfile
+import time
+import uuid
+import weakref
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+import xlsxwriter
+
+from utils.group_index import GROUP_KEYS
+from utils.repayment import REPAYMENT_COLUMNS, process_repayment_data
+from utils.store import STORE_DIR
+
+EXPORT_DIR = os.path.join(STORE_DIR, 'exports')
+# 화면 표시명 -> 확장자
+EXPORT_FORMATS = {'엑셀 (xlsx)': 'xlsx', 'CSV': 'csv', 'Parquet': 'parquet'}
+MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# 투자내역에서 회차 행에 붙여 내보낼 상품 정보
+PRODUCT_COLUMNS = ['투자계약일', '상품유형']
+AMOUNT_COLUMNS = ['지급원금', '지급이자', '연체이자', '실제지급액']
+SUMMARY_SHEET = '요약'
+# 세션이 비정상 종료되어 남은 내보내기 파일을 지우는 기준 (초)
+EXPORT_MAX_AGE = 24 * 60 * 60
+# 엑셀 시트명에 쓸 수 없는 문자와 최대 길이
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+MAX_SHEET_NAME = 31
+
+
+# 업체별로 (업체명, 내보낼 회차 행) 반환
+# 한 번에 한 업체의 행만 만들어 전체 데이터의 두 번째 복사본이 메모리에 생기지 않게 함
+def iter_platforms(df1, normalized):
+    product_columns = [col for col in PRODUCT_COLUMNS if col in df1.columns]
+    info = df1.drop_duplicates(GROUP_KEYS).set_index(GROUP_KEYS)[product_columns]
+    columns = GROUP_KEYS + product_columns + REPAYMENT_COLUMNS
+
+    positions = normalized.groupby('업체명', sort=True, observed=True).indices
+    for platform, rows in positions.items():
+        part = normalized.iloc[rows]
+        keys = pd.MultiIndex.from_arrays([part[col] for col in GROUP_KEYS])
+        extra = info.reindex(keys)
+        # df1 의 컬럼 형식을 그대로 유지 (업체마다 형식이 달라지지 않도록)
+        frame = part.assign(**{col: extra[col].array for col in product_columns})
+        yield platform, frame[columns]
+
+
+# 업체별 상품 수, 회차 수, 금액 합계
+def platform_summary(normalized):
+    grouped = normalized.groupby('업체명', sort=True, observed=True)
+    summary = grouped.agg(**{'상품 수': ('상품명', 'nunique'), '회차 수': ('회차', 'size')})
+    summary = summary.join(grouped[AMOUNT_COLUMNS].sum())
+    return summary.reset_index()
+
+
+def _rows(frame):
+    # 빈 값은 None (빈 셀), category 는 문자열로
+    values = [frame[col].astype(object).where(frame[col].notna(), None).tolist() for col in frame.columns]
+    return zip(*values)
+
+
+def _sheet_name(name, used):
+    base = INVALID_SHEET_CHARS.sub('_', str(name))[:MAX_SHEET_NAME] or '_'
+    sheet_name = base
+    n = 2
+    while sheet_name.lower() in used:
+        suffix = f' ({n})'
+        sheet_name = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+        n += 1
+    used.add(sheet_name.lower())
+    return sheet_name
+
+
+def _write_sheet(worksheet, frame, header_format):
+    worksheet.write_row(0, 0, list(frame.columns), header_format)
+    worksheet.set_column(0, len(frame.columns) - 1, 14)
+    worksheet.freeze_panes(1, 0)
+    for row_no, row in enumerate(_rows(frame), start=1):
+        worksheet.write_row(row_no, 0, row)
+
+
+# 요약 시트와 업체별 시트로 된 엑셀 파일
+# constant_memory 모드는 한 행을 다 쓰면 바로 디스크로 내보내므로 행 수와 관계없이 메모리 사용량이 일정함
+def write_excel(path, df1, normalized):
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+    try:
+        header_format = workbook.add_format({'bold': True, 'bg_color': '#F2F2F2'})
+        used_names = {SUMMARY_SHEET.lower()}
+        _write_sheet(workbook.add_worksheet(SUMMARY_SHEET), platform_summary(normalized), header_format)
+        for platform, frame in iter_platforms(df1, normalized):
+            _write_sheet(workbook.add_worksheet(_sheet_name(platform, used_names)), frame, header_format)
+    finally:
+        workbook.close()
+
+
+# 업체별로 이어 쓰는 CSV (엑셀에서 한글이 깨지지 않도록 BOM 포함)
+def write_csv(path, df1, normalized):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        for i, (_, frame) in enumerate(iter_platforms(df1, normalized)):
+            frame.to_csv(f, header=i == 0, index=False, date_format='%Y-%m-%d')
+
+
+# 전체 데이터 기준의 Parquet 스키마
+# 업체 하나만 보고 만들면 그 업체에서 값이 모두 빈 컬럼(상품유형이 없는 내보내기 파일 등)이 null 형식으로 고정됨
+def parquet_schema(df1, normalized):
+    product_columns = [col for col in PRODUCT_COLUMNS if col in df1.columns]
+    sources = {col: normalized[col] for col in GROUP_KEYS + REPAYMENT_COLUMNS}
+    sources.update({col: df1[col] for col in product_columns})
+    fields = []
+    for col in GROUP_KEYS + product_columns + REPAYMENT_COLUMNS:
+        series = sources[col]
+        field_type = pa.Schema.from_pandas(series.iloc[0:0].to_frame(), preserve_index=False).field(col).type
+        # object 컬럼은 빈 데이터로는 형식을 알 수 없으므로 실제 값으로 판단
+        if pa.types.is_null(field_type):
+            values = series.dropna()
+            if len(values):
+                field_type = pa.Array.from_pandas(values.iloc[:1]).type
+        fields.append(pa.field(col, field_type))
+    return pa.schema(fields)
+
+
+# 업체 하나를 row group 하나로 기록하는 Parquet
+def write_parquet(path, df1, normalized):
+    schema = parquet_schema(df1, normalized)
+    with pq.ParquetWriter(path, schema) as writer:
+        for _, frame in iter_platforms(df1, normalized):
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+
+WRITERS = {'xlsx': write_excel, 'csv': write_csv, 'parquet': write_parquet}
+
+
+# 임시 파일에 기록한 뒤 교체 (기록 도중 실패해도 이전 파일이 깨지지 않음)
+def export_portfolio(fmt, df1, normalized, path):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=f'.{fmt}', dir=directory)
+    os.close(fd)
+    try:
+        WRITERS[fmt](tmp_path, df1, normalized)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _remove_files(paths):
+    for path in paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# 서버가 중간에 종료되는 등으로 세션 정리가 실행되지 않고 남은 오래된 파일 삭제
+def _remove_stale_exports(max_age=EXPORT_MAX_AGE):
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        if entry.is_file() and entry.name.startswith('portfolio_') and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+
+
+class ExportFiles:
+    # 세션에서 만든 내보내기 파일 (형식 -> 데이터 버전, 경로)
+    # 세션이 끝나 세션 상태가 정리되면 파일도 삭제
+    def __init__(self):
+        # 다른 세션이나 서버 재시작 전의 파일과 겹치지 않도록 세션마다 다른 파일명 사용
+        self.token = uuid.uuid4().hex[:8]
+        self._versions = {}
+        self._paths = {}
+        weakref.finalize(self, _remove_files, self._paths)
+
+    def path(self, fmt, version):
+        return os.path.join(EXPORT_DIR, f"portfolio_{self.token}_{version}.{fmt}")
+
+    def add(self, fmt, version, path):
+        previous = self._paths.get(fmt)
+        if previous is not None and previous != path and os.path.exists(previous):
+            os.remove(previous)
+        self._versions[fmt] = version
+        self._paths[fmt] = path
+
+    # 현재 데이터 버전으로 만든 파일 경로 (없으면 None)
+    def get(self, fmt, version):
+        path = self._paths.get(fmt)
+        if self._versions.get(fmt) != version or path is None or not os.path.exists(path):
+            return None
+        return path
+
+
+# 다운로드 버튼을 누를 때만 파일을 읽음 (재실행마다 파일 전체를 Streamlit 메모리에 올리지 않음)
+def _file_reader(path):
+    def read():
+        with open(path, 'rb') as f:
+            return f.read()
+    return read
+
+
+# 병합 데이터 내보내기 화면 (버튼을 누를 때만 파일을 만들고, 같은 데이터면 만든 파일을 재사용)
+# normalized 가 없으면 버튼을 누를 때 df2 를 process_repayment_data 로 정리
+def show_export(df1, df2, version, normalized=None):
+    if 'export_files' not in st.session_state:
+        _remove_stale_exports()
+        st.session_state.export_files = ExportFiles()
+    exports = st.session_state.export_files
+
+    with st.expander("📥 병합 데이터 내보내기"):
+        label = st.radio("형식", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+        fmt = EXPORT_FORMATS[label]
+
+        if st.button("내보내기 파일 만들기", key="export_button"):
+            if normalized is None:
+                normalized = process_repayment_data(df2, key_columns=GROUP_KEYS)
+            path = exports.path(fmt, version)
+            try:
+                with st.spinner("내보내기 파일을 만드는 중..."):
+                    export_portfolio(fmt, df1, normalized, path)
+            except Exception as e:
+                st.error(f"내보내기 중 오류 발생: {e}")
+            else:
+                exports.add(fmt, version, path)
+
+        path = exports.get(fmt, version)
+        if path is None:
+            st.caption("버튼을 누르면 현재 병합된 데이터로 파일을 만듭니다.")
+            return
+
+        st.download_button(
+            "다운로드",
+            _file_reader(path),
+            file_name=f"portfolio.{fmt}",
+            mime=MIME_TYPES[fmt],
+            key=f"export_download_{fmt}",
+        )
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+GROUP_KEYS = ['업체명', '상품명']
+# 상품 안의 행은 회차 순으로 정렬 (병합 중 교체된 행이 뒤로 가도 회차 순서대로 표시)
+ORDER_COLUMN = '회차'
+
+
+class GroupIndex:
+    # (업체명, 상품명) 별 회차별 상세정보 행 위치를 미리 계산해 두고 바로 찾아 쓰는 인덱스
+    # 상품마다 전체 데이터를 비교하지 않고 해당 상품의 행만 꺼냄
+    def __init__(self, df, keys=GROUP_KEYS):
+        self.df = df
+        self.keys = list(keys)
+        # category 컬럼이면 실제로 있는 (업체명, 상품명) 조합만
+        self._positions = df.groupby(self.keys, sort=False, observed=True).indices
+        if ORDER_COLUMN in df.columns:
+            # 숫자로 읽을 수 없는 회차는 맨 뒤 (같은 회차끼리는 원래 순서 유지)
+            order = pd.to_numeric(df[ORDER_COLUMN], errors='coerce').to_numpy(dtype=float)
+            self._positions = {
+                key: positions[np.argsort(order[positions], kind='stable')]
+                for key, positions in self._positions.items()
+            }
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    # 해당 상품의 행이 없으면 빈 데이터프레임 반환
+    def get(self, company, product):
+        positions = self._positions.get((company, product))
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
@@ -0,0 +1,213 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.workbook import file_digest, parse_workbook, with_file_name
+
+# 새로 파싱할 파일이 이 개수 이상일 때만 프로세스 풀 사용 (워커 기동 비용 때문)
+PARALLEL_MIN_FILES = 4
+
+_pool = None
+# 여러 세션의 수집 작업 스레드가 동시에 풀을 만들거나 교체하므로 잠금으로 보호
+_pool_lock = threading.Lock()
+
+
+# 서버 프로세스 전체에서 재사용하는 프로세스 풀
+# 스트림릿 서버는 여러 스레드를 쓰므로 fork 대신 spawn 으로 워커를 띄움
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+# 망가진 풀만 교체 (다른 작업이 이미 새로 만든 풀은 그대로 둠)
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# 끝나는 순서대로 (해시, ParsedWorkbook, 오류) 반환 (jobs: 해시 -> (데이터, 파일명))
+def _iter_parse(jobs, parallel):
+    if parallel:
+        pool = _get_pool()
+        futures = {pool.submit(parse_workbook, data, name): digest for digest, (data, name) in jobs.items()}
+        for future in as_completed(futures):
+            digest = futures[future]
+            try:
+                yield digest, future.result(), None
+            except BrokenProcessPool as e:
+                # 워커가 비정상 종료되면 다음 실행을 위해 풀을 새로 만듦
+                _reset_pool(pool)
+                yield digest, None, e
+            except Exception as e:
+                yield digest, None, e
+    else:
+        for digest, (data, name) in jobs.items():
+            try:
+                yield digest, parse_workbook(data, name), None
+            except Exception as e:
+                yield digest, None, e
+
+
+class LocalFile:
+    # 디스크의 파일을 st.file_uploader 의 UploadedFile 처럼 다루기 위한 객체 (일괄 수집용)
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.file_id = os.path.abspath(path)
+        self._data = None
+
+    def getvalue(self):
+        if self._data is None:
+            with open(self.path, 'rb') as f:
+                self._data = f.read()
+        return self._data
+
+
+# 업로드된 파일들을 파싱하여 끝나는 순서대로 (업로드 순서 번호, (파일명, ParsedWorkbook, 오류)) 반환
+# 캐시에 있는 파일과 읽을 수 없는 파일이 먼저 나오고, 나머지는 파일이 많으면 프로세스 풀에서 병렬로 파싱
+def iter_ingest(files, cache, parallel=True):
+    positions = {}  # 해시 -> 같은 내용인 파일들의 업로드 순서 번호
+    jobs = {}
+
+    for i, file in enumerate(files):
+        # 해시를 이미 알고 있는 파일(UploadEntry)은 캐시에 있으면 원본을 읽지 않음
+        data = None
+        try:
+            digest = getattr(file, 'digest', None)
+            if digest is None:
+                data = file.getvalue()
+                digest = file_digest(data)
+        except Exception as e:
+            yield i, (file.name, None, e)
+            continue
+
+        # 같은 내용의 파일이 여러 번 올라와도 한 번만 조회/파싱
+        if digest in positions:
+            positions[digest].append(i)
+            continue
+        parsed = cache.get(digest)
+        if parsed is not None:
+            yield i, (file.name, with_file_name(parsed, file.name), None)
+            # 뒤에 같은 내용의 파일이 나오면 캐시에서 다시 찾음
+            continue
+
+        try:
+            jobs[digest] = (data if data is not None else file.getvalue(), file.name)
+        except Exception as e:
+            yield i, (file.name, None, e)
+            continue
+        positions[digest] = [i]
+
+    use_pool = parallel and len(jobs) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1
+    for digest, parsed, error in _iter_parse(jobs, use_pool):
+        if error is None:
+            cache.put(digest, parsed)
+        for i in positions[digest]:
+            name = files[i].name
+            if error is not None:
+                yield i, (name, None, error)
+            else:
+                yield i, (name, with_file_name(parsed, name), None)
+
+
+# 업로드 순서대로 (파일명, ParsedWorkbook, 오류) 목록 반환
+def ingest_files(files, cache, parallel=True):
+    results = [None] * len(files)
+    for i, result in iter_ingest(files, cache, parallel):
+        results[i] = result
+    return results
+
+
+class IngestJob:
+    # 업로드 파일을 백그라운드 스레드에서 파싱하고 파일별 진행 상황을 기록
+    # 병합 데이터는 스크립트 스레드에서만 바꾸도록, 결과는 take_ready() 로 업로드 순서대로 가져가서 병합
+    def __init__(self, files, cache, parallel=True):
+        self.files = list(files)
+        self._results = [None] * len(self.files)
+        self._done = 0
+        self._taken = 0
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(cache, parallel), name='ingest-job', daemon=True)
+        self._thread.start()
+
+    def _run(self, cache, parallel):
+        try:
+            for i, result in iter_ingest(self.files, cache, parallel):
+                with self._lock:
+                    self._results[i] = result
+                    self._done += 1
+        except Exception as e:
+            # 예상하지 못한 오류로 중단되면 남은 파일을 모두 오류로 표시
+            with self._lock:
+                for i, file in enumerate(self.files):
+                    if self._results[i] is None:
+                        self._results[i] = (file.name, None, e)
+                self._done = len(self.files)
+        finally:
+            self._finished.set()
+
+    @property
+    def total(self):
+        return len(self.files)
+
+    @property
+    def done(self):
+        with self._lock:
+            return self._done
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    # 모든 결과를 가져갔으면 True
+    @property
+    def exhausted(self):
+        with self._lock:
+            return self._taken == len(self.files)
+
+    # 파싱이 금방 끝나는 작은 작업은 기다렸다가 바로 병합 (진행 표시 없이)
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    # 앞에서부터 연속으로 끝난 파일의 (파일, 결과) 목록 (한 번 가져간 결과는 다시 주지 않음)
+    # 업로드 순서대로 병합해야 같은 상품이 여러 파일에 있을 때 뒤 파일 내용이 남음
+    def take_ready(self):
+        ready = []
+        with self._lock:
+            while self._taken < len(self.files) and self._results[self._taken] is not None:
+                ready.append((self.files[self._taken], self._results[self._taken]))
+                self._taken += 1
+        return ready
+
+    def has_ready(self):
+        with self._lock:
+            return self._taken < len(self.files) and self._results[self._taken] is not None
+
+    # 파일별 상태 (파일명, 상태) 목록
+    def status(self):
+        with self._lock:
+            results = list(self._results)
+        rows = []
+        for file, result in zip(self.files, results):
+            if result is None:
+                rows.append((file.name, '처리 중'))
+            elif result[2] is not None:
+                rows.append((file.name, f'오류: {result[2]}'))
+            elif result[1].main is None:
+                rows.append((file.name, '시트 없음'))
+            else:
+                rows.append((file.name, '완료'))
+        return rows
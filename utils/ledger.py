@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# 투자 내역 컬럼과 고정 dtype (빈 데이터프레임에 concat 하면서 object 로 바뀌지 않도록 함)
+LEDGER_COLUMNS = {
+    "서비스명": object,
+    "상품명": object,
+    "상품상태": object,
+    "투자일자": "datetime64[D]",
+    "투자금액": np.int64,
+    "수익률": np.float64,
+    "투자기간": np.int64,
+    "대출유형": object,
+}
+
+
+class InvestmentLedger:
+    # 고정 크기 조각(chunk)에 컬럼별 배열로 쌓는 투자 내역 장부
+    # 추가는 배열 한 칸에 쓰는 것으로 끝나고, 데이터프레임은 필요할 때만 만들어 다음 추가 전까지 재사용
+    def __init__(self, chunk_size=1024):
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._size = 0
+        self._frame = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def empty(self):
+        return self._size == 0
+
+    def _new_chunk(self):
+        return {col: np.empty(self.chunk_size, dtype=dtype) for col, dtype in LEDGER_COLUMNS.items()}
+
+    # entry: 컬럼명 -> 값 딕셔너리
+    def append(self, entry):
+        position = self._size % self.chunk_size
+        if position == 0:
+            self._chunks.append(self._new_chunk())
+
+        chunk = self._chunks[-1]
+        for col in LEDGER_COLUMNS:
+            value = entry[col]
+            if col == "투자일자":
+                value = np.datetime64(pd.Timestamp(value).date(), "D")
+            chunk[col][position] = value
+
+        self._size += 1
+        self._frame = None
+
+    def to_frame(self):
+        if self._frame is None:
+            data = {}
+            for col, dtype in LEDGER_COLUMNS.items():
+                if self._chunks:
+                    data[col] = np.concatenate([chunk[col] for chunk in self._chunks])[:self._size]
+                else:
+                    data[col] = np.empty(0, dtype=dtype)
+            self._frame = pd.DataFrame(data)
+        return self._frame
+
+    def to_records(self):
+        return self.to_frame().to_dict('records')
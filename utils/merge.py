@@ -0,0 +1,226 @@
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.dtypes import compact_frame, concat_frames
+
+# 투자내역은 (업체명, 상품명), 회차별 상세정보는 (업체명, 상품명, 회차) 기준으로 한 행만 유지
+MAIN_KEYS = ['업체명', '상품명']
+DETAIL_KEYS = ['업체명', '상품명', '회차']
+
+# 세션이 달라도 겹치지 않는 병합 버전 번호
+_versions = itertools.count(1)
+
+
+# 키 컬럼이 모두 있으면 해당 컬럼 값, 하나라도 없으면 전체 컬럼 값으로 행 키를 만듦
+# (drop_duplicates 와 같이 NaN 끼리는 같은 값으로 취급)
+def _row_keys(df, key_columns):
+    columns = key_columns if all(col in df.columns for col in key_columns) else list(df.columns)
+    values = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in columns]
+    return list(zip(*values))
+
+
+class MergedTable:
+    # 키 인덱스를 유지하면서 새로 들어온 행만 반영하는 병합 테이블
+    # 같은 키가 다시 들어오면 기존 행을 새 행으로 교체 (같은 파일 안의 중복은 처음 행 유지)
+    def __init__(self, key_columns):
+        self.key_columns = list(key_columns)
+        self._chunks = []  # 추가된 데이터프레임 목록
+        self._alive = []  # 조각별 유효 행 표시 (교체된 행은 False)
+        self._index = {}  # 행 키 -> (조각 번호, 행 위치)
+        self._tracked = set()  # 저장소가 아닌 업로드 파일에서 들어온 행 키
+        self._frame = None
+
+    def __len__(self):
+        return len(self._index)
+
+    # 새 데이터 크기에 비례하는 시간으로 반영
+    # track=True 면 이 행들을 tracked_frame() 에 포함 (저장소에서 불러온 행은 False)
+    def upsert(self, df, track=True):
+        df = df.reset_index(drop=True)
+        chunk_no = len(self._chunks)
+        alive = np.ones(len(df), dtype=bool)
+
+        for position, key in enumerate(_row_keys(df, self.key_columns)):
+            if track:
+                self._tracked.add(key)
+            previous = self._index.get(key)
+            if previous is not None:
+                previous_chunk, previous_position = previous
+                if previous_chunk == chunk_no:
+                    alive[position] = False
+                    continue
+                self._alive[previous_chunk][previous_position] = False
+            self._index[key] = (chunk_no, position)
+
+        self._chunks.append(df)
+        self._alive.append(alive)
+        self._frame = None
+
+    # 유효한 행만 모은 데이터프레임 (다음 upsert 전까지 재사용)
+    # 만들면서 조각들을 하나로 합쳐 교체된 행이 메모리에 남지 않게 함
+    def frame(self):
+        if self._frame is not None:
+            return self._frame
+
+        if not self._chunks:
+            self._frame = pd.DataFrame()
+            return self._frame
+
+        parts = [chunk[alive] for chunk, alive in zip(self._chunks, self._alive)]
+        frame = concat_frames(parts)
+
+        # 기존 (조각, 위치)를 합친 데이터프레임의 위치로 변환
+        new_positions = []
+        offset = 0
+        for alive in self._alive:
+            new_positions.append(offset + np.cumsum(alive) - 1)
+            offset += int(alive.sum())
+        self._index = {
+            key: (0, int(new_positions[chunk_no][position]))
+            for key, (chunk_no, position) in self._index.items()
+        }
+
+        self._chunks = [frame]
+        self._alive = [np.ones(len(frame), dtype=bool)]
+        self._frame = frame
+        return frame
+
+    # 반영된 데이터프레임은 함께 쓰고 키 인덱스만 복사한 테이블 (복사본에 upsert 해도 원본은 그대로)
+    def copy(self):
+        table = MergedTable(self.key_columns)
+        table._chunks = list(self._chunks)
+        table._alive = [alive.copy() for alive in self._alive]
+        table._index = dict(self._index)
+        table._tracked = set(self._tracked)
+        table._frame = self._frame
+        return table
+
+    # 업로드 파일에서 들어온 행만 (저장소에서 불러온 행을 같은 키로 교체한 행 포함)
+    def tracked_frame(self):
+        frame = self.frame()
+        positions = sorted(self._index[key][1] for key in self._tracked if key in self._index)
+        return frame.iloc[positions]
+
+
+# 합쳐진 프레임에서는 키 컬럼이 없던 파일(회차가 없는 상세정보 등)의 행이 키 값이 빈 채로 들어 있음
+# 이런 행끼리 같은 키로 합쳐지지 않도록 원래처럼 전체 컬럼 기준으로 따로 반영
+def _upsert_tracked(table, frame):
+    if all(col in frame.columns for col in table.key_columns):
+        missing = frame[table.key_columns].isna().any(axis=1)
+        if missing.any():
+            table.upsert(frame[~missing])
+            table.upsert(frame[missing].dropna(axis=1, how='all'))
+            return
+    table.upsert(frame)
+
+
+class MergedData:
+    # 병합된 투자내역/회차별 상세정보와 그로부터 만든 정리된 회차 내역, 인덱스 등
+    # share() 한 뒤로는 여러 세션이 함께 읽으므로 고치지 않음 (새 파일은 copy() 한 것에 반영)
+    def __init__(self):
+        self.main = MergedTable(MAIN_KEYS)
+        self.detail = MergedTable(DETAIL_KEYS)
+        self.version = 0  # 데이터가 바뀔 때마다 새 번호 (0 이면 데이터 없음)
+        self.shared = False
+        self._derived = {}  # 이름 -> 병합 데이터로 만든 값
+        self._lock = threading.RLock()
+
+    # 반영하기 전에 컬럼 형식을 줄여 세션 메모리와 그룹/필터 비용을 줄임
+    def add(self, df1, df2, from_store=False):
+        self.main.upsert(compact_frame(df1), track=not from_store)
+        self.detail.upsert(compact_frame(df2), track=not from_store)
+        self._derived.clear()
+        self.version = next(_versions)
+
+    def copy(self):
+        data = MergedData()
+        data.main = self.main.copy()
+        data.detail = self.detail.copy()
+        data.version = self.version
+        return data
+
+    # 다른 세션과 함께 읽을 수 있게 병합 프레임을 미리 만들어 둠 (읽는 중에 프레임을 새로 만들지 않도록)
+    def share(self):
+        self.main.frame()
+        self.detail.frame()
+        self.shared = True
+
+    # 병합 데이터로 만든 값 (처음 요청한 세션이 한 번만 만들고 같은 데이터를 쓰는 세션은 그대로 사용)
+    def derived(self, name, build):
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build()
+            return self._derived[name]
+
+
+class PortfolioMerge:
+    # 세션 하나가 업로드 파일들을 누적 병합한 결과
+    # cache 를 주면 같은 저장소 세대에 같은 파일을 같은 순서로 반영한 다른 세션과 병합 데이터를 공유
+    # key 는 (저장소 디렉터리, 세대 id, 반영한 파일 해시...) 이고, 공유할 수 없는 병합이면 None
+    def __init__(self, data=None, cache=None, key=None):
+        self.data = data if data is not None else MergedData()
+        self.cache = cache
+        self.key = key
+        self.merged_ids = set()  # 반영이 끝난 업로드 파일 id
+        self.errors = {}  # 파일 id -> 오류 메시지
+        self.warnings = {}  # 파일 id -> 경고 메시지
+
+    @property
+    def main(self):
+        return self.data.main
+
+    @property
+    def detail(self):
+        return self.data.detail
+
+    @property
+    def version(self):
+        return self.data.version
+
+    # 아직 반영되지 않은 업로드 파일 (같은 파일이 여러 번 있어도 한 번만)
+    def pending(self, files):
+        seen = set()
+        result = []
+        for file in files:
+            if file.file_id in self.merged_ids or file.file_id in seen:
+                continue
+            seen.add(file.file_id)
+            result.append(file)
+        return result
+
+    # digest 는 반영하는 파일의 내용 해시 (다른 세션이 같은 순서로 이미 반영했으면 그 결과를 그대로 사용)
+    # 저장소에서 불러온 데이터는 from_store=True (rebased 에서 다시 반영하지 않음)
+    def add(self, df1, df2, digest=None, from_store=False):
+        self.key = self.key + (digest,) if self.key is not None and digest is not None else None
+        if self.key is not None and self.cache is not None:
+            data = self.cache.get(self.key)
+            if data is not None:
+                self.data = data
+                return
+        if self.data.shared:
+            self.data = self.data.copy()
+        self.data.add(df1, df2, from_store)
+
+    # 반영을 마친 병합 데이터를 다른 세션이 쓸 수 있게 공유 (같은 키로 먼저 공유된 것이 있으면 그것을 사용)
+    def share(self):
+        if self.cache is not None and self.key is not None:
+            self.data = self.cache.put(self.key, self.data)
+
+    # 다른 세션이나 일괄 수집이 저장한 최신 저장소 데이터(load_combined 결과, 없으면 None) 위에
+    # 이 병합의 업로드 행만 다시 반영한 새 병합 (불러온 뒤에 바뀐 저장소를 예전 데이터로 덮어쓰지 않도록)
+    # 새 병합은 저장해서 세대 id 가 정해지기 전까지 공유하지 않음
+    def rebased(self, stored):
+        data = MergedData()
+        if stored is not None:
+            data.add(*stored, from_store=True)
+        _upsert_tracked(data.main, self.main.tracked_frame())
+        _upsert_tracked(data.detail, self.detail.tracked_frame())
+        data.version = next(_versions)
+        rebased = PortfolioMerge(data, self.cache)
+        rebased.merged_ids = self.merged_ids
+        rebased.errors = self.errors
+        rebased.warnings = self.warnings
+        return rebased
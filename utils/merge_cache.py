@@ -0,0 +1,96 @@
+import os
+import threading
+import weakref
+
+import streamlit as st
+
+from utils.merge import MergedData, PortfolioMerge
+from utils.store import (MAIN_TABLE, load_combined, load_normalized, save_combined, store_generation, store_lock,
+                         table_path)
+
+
+# 병합 데이터를 공유하는 키 (세대 id 가 없으면 비어 있는 저장소)
+def merge_key(store_dir, generation):
+    return (os.path.abspath(store_dir), generation)
+
+
+class SharedMergeCache:
+    # 서버 프로세스의 모든 세션이 함께 쓰는 병합 데이터 (저장소 세대와 반영한 파일 해시 순서 기준)
+    # 같은 저장소에 같은 내보내기 파일들을 올린 세션들은 병합 프레임, 정리된 회차 내역, 인덱스를 한 벌만 가짐
+    # 항목은 약한 참조로만 보관하므로 그 데이터를 쓰는 세션이 모두 끝나면 함께 해제됨
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data = weakref.WeakValueDictionary()  # 키 -> MergedData
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            data = self._data.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return data
+
+    # 같은 키로 먼저 공유된 데이터가 있으면 그것을 반환
+    def put(self, key, data):
+        data.share()
+        with self._lock:
+            existing = self._data.get(key)
+            if existing is not None:
+                return existing
+            self._data[key] = data
+            return data
+
+
+# 서버 프로세스에 하나만 만들어 모든 세션이 공유
+@st.cache_resource(show_spinner=False)
+def shared_merge_cache():
+    return SharedMergeCache()
+
+
+# 저장소의 병합 데이터를 세션 병합으로 불러와 (병합, 세대 id) 반환
+# 같은 세대를 이미 불러온 세션이 있으면 디스크에서 다시 읽지 않고 그 데이터를 함께 씀
+# 세대 id 는 저장할 때 그 사이에 다른 세션이나 일괄 수집이 저장했는지 확인하는 데 사용
+def load_merge(store_dir):
+    cache = shared_merge_cache()
+    with store_lock(store_dir):
+        generation = store_generation(store_dir)
+        key = merge_key(store_dir, generation)
+        # 세대 id 없이 저장된 예전 저장소는 내용을 알 수 없으므로 공유하지 않음
+        if generation is None and os.path.exists(table_path(MAIN_TABLE, store_dir)):
+            key = None
+        data = cache.get(key) if key is not None else None
+        if data is None:
+            data = MergedData()
+            stored = load_combined(store_dir)
+            if stored is not None:
+                data.add(*stored, from_store=True)
+                # 일괄 수집 때 미리 정리해 둔 회차 내역이 있으면 그대로 사용
+                normalized = load_normalized(store_dir)
+                if normalized is not None:
+                    data.derived('normalized', lambda: normalized)
+    merged = PortfolioMerge(data, cache, key)
+    merged.share()
+    return merged, generation
+
+
+# 세션 병합을 저장소에 기록하고 (병합, 새 세대 id) 반환
+# 불러온 뒤에 다른 세션이나 일괄 수집이 저장했으면 최신 저장소 위에 이 세션의 업로드 행만 다시 반영해서 저장
+# 같은 파일을 반영한 다른 세션이 이미 이 데이터를 저장했으면 다시 쓰지 않음
+def save_merge(merged, store_dir, generation):
+    # 같은 파일들을 같은 순서로 반영하는 다른 세션이 저장 전에도 이 데이터를 쓸 수 있게 먼저 공유
+    merged.share()
+    with store_lock(store_dir):
+        current = store_generation(store_dir)
+        if merged.cache is None or merged.cache.get(merge_key(store_dir, current)) is not merged.data:
+            if current != generation:
+                merged = merged.rebased(load_combined(store_dir))
+            current = save_combined(merged.main.frame(), merged.detail.frame(), store_dir=store_dir)
+    merged.key = merge_key(store_dir, current)
+    merged.share()
+    return merged, current
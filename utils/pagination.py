@@ -0,0 +1,20 @@
+import math
+
+import streamlit as st
+
+PAGE_SIZE = 20
+
+
+# 항목이 한 페이지보다 많으면 페이지 선택 위젯을 표시하고 현재 페이지의 행만 반환
+def paginate(df, key, page_size=PAGE_SIZE):
+    total = len(df)
+    page_count = max(1, math.ceil(total / page_size))
+    if page_count == 1:
+        return df
+
+    page = st.number_input(f"페이지 (전체 {page_count}쪽)", min_value=1, max_value=page_count, value=1, step=1, key=key)
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    st.caption(f"전체 {total}개 상품 중 {start + 1}~{end}번째")
+
+    return df.iloc[start:end]
@@ -0,0 +1,204 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+
+# 모든 세션이 공유하는 파싱 캐시의 메모리 한도 (바이트)
+SHARED_CACHE_BUDGET = 1024 * 1024 * 1024
+
+
+# 파싱 결과가 차지하는 메모리 (바이트)
+def parsed_size(parsed):
+    if parsed.main is None:
+        return 0
+    return int(parsed.main.memory_usage(deep=True).sum() + parsed.detail.memory_usage(deep=True).sum())
+
+
+class ParseCache:
+    # 파일 내용 해시와 선택된 시트명을 키로 파싱 결과를 보관하는 LRU 캐시
+    # 캐시된 데이터프레임은 여러 번 재사용되므로 호출하는 쪽에서 직접 수정하면 안 됨
+    # max_bytes 를 주면 파싱 결과의 메모리 합계가 넘지 않도록 오래된 항목부터 제거 (가장 최근 항목은 유지)
+    def __init__(self, max_entries=64, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._sheets = OrderedDict()  # 해시 -> (주 시트명, 상세 시트명)
+        self._parsed = OrderedDict()  # (해시, 주 시트명, 상세 시트명) -> ParsedWorkbook
+        self._sizes = {}  # (해시, 주 시트명, 상세 시트명) -> 바이트
+
+    def __len__(self):
+        return len(self._parsed)
+
+    def _get(self, store, key):
+        value = store.get(key)
+        if value is not None:
+            store.move_to_end(key)
+        return value
+
+    def _put(self, store, key, value):
+        store[key] = value
+        store.move_to_end(key)
+        # 가장 오래 사용되지 않은 항목부터 제거
+        while len(store) > self.max_entries:
+            self._evict(store)
+
+    def _evict(self, store):
+        key, _ = store.popitem(last=False)
+        self.total_bytes -= self._sizes.pop(key, 0)
+        if store is self._parsed:
+            self.evictions += 1
+
+    # 캐시에 없으면 None 반환
+    def get(self, digest):
+        sheets = self._get(self._sheets, digest)
+        parsed = None
+        if sheets is not None:
+            parsed = self._get(self._parsed, (digest, *sheets))
+
+        if parsed is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return parsed
+
+    def put(self, digest, parsed):
+        sheets = (parsed.sheet_main, parsed.sheet_detail)
+        key = (digest, *sheets)
+        self.total_bytes -= self._sizes.pop(key, 0)
+        size = parsed_size(parsed)
+        self._sizes[key] = size
+        self.total_bytes += size
+        self._put(self._sheets, digest, sheets)
+        self._put(self._parsed, key, parsed)
+
+        if self.max_bytes is not None:
+            while self.total_bytes > self.max_bytes and len(self._parsed) > 1:
+                self._evict(self._parsed)
+
+    def clear(self):
+        self._sheets.clear()
+        self._parsed.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+
+
+class SharedParseCache:
+    # 서버 프로세스의 모든 세션이 함께 쓰는 파싱 결과 캐시 (파일 내용 해시 기준)
+    # 같은 내보내기 파일을 여러 사용자가 올려도 서버에서 한 번만 파싱하고 같은 데이터프레임을 공유
+    # 세션이 사용 중인 항목은 참조 수로 세어, 한도를 넘으면 아무도 쓰지 않는 항목부터 제거
+    def __init__(self, max_bytes=SHARED_CACHE_BUDGET):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._parsed = OrderedDict()  # 해시 -> ParsedWorkbook
+        self._sizes = {}  # 해시 -> 바이트
+        self._refs = {}  # 해시 -> 사용 중인 세션 수
+
+    def __len__(self):
+        return len(self._parsed)
+
+    # acquire=True 면 찾은 항목의 참조를 같은 잠금 안에서 잡음 (찾은 직후 다른 세션이 제거하지 못하게)
+    def get(self, digest, acquire=False):
+        with self._lock:
+            parsed = self._parsed.get(digest)
+            if parsed is None:
+                self.misses += 1
+            else:
+                self._parsed.move_to_end(digest)
+                self.hits += 1
+                if acquire:
+                    self._acquire(digest)
+            return parsed
+
+    # 저장한 항목은 이번 정리에서 제거하지 않음
+    def put(self, digest, parsed, acquire=False):
+        size = parsed_size(parsed)
+        with self._lock:
+            self.total_bytes += size - self._sizes.get(digest, 0)
+            self._parsed[digest] = parsed
+            self._parsed.move_to_end(digest)
+            self._sizes[digest] = size
+            if acquire:
+                self._acquire(digest)
+            self._evict(keep=digest)
+
+    def _acquire(self, digest):
+        self._refs[digest] = self._refs.get(digest, 0) + 1
+
+    def acquire(self, digest):
+        with self._lock:
+            self._acquire(digest)
+
+    def release(self, digests):
+        with self._lock:
+            for digest in digests:
+                count = self._refs.get(digest, 0) - 1
+                if count > 0:
+                    self._refs[digest] = count
+                else:
+                    self._refs.pop(digest, None)
+            self._evict()
+
+    # 한도를 넘으면 참조가 없는 항목부터, 그래도 넘으면 사용 중인 항목도 오래된 순으로 제거
+    # (keep 항목은 한도를 넘어도 유지, 호출하는 쪽에서 잠금을 잡고 있어야 함)
+    def _evict(self, keep=None):
+        if self.total_bytes <= self.max_bytes:
+            return
+        candidates = [digest for digest in self._parsed if digest not in self._refs]
+        candidates.extend(digest for digest in self._parsed if digest in self._refs)
+        for digest in candidates:
+            if self.total_bytes <= self.max_bytes or len(self._parsed) <= 1:
+                break
+            if digest == keep:
+                continue
+            del self._parsed[digest]
+            self.total_bytes -= self._sizes.pop(digest)
+            self.evictions += 1
+
+    def session(self):
+        return SessionParseCache(self)
+
+    def clear(self):
+        with self._lock:
+            self._parsed.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+
+
+class SessionParseCache:
+    # 세션 하나가 공유 캐시를 쓰는 창구 (ingest_files 에 ParseCache 대신 넘김)
+    # 세션에서 쓴 항목의 참조를 잡아 두고, 세션 상태가 사라지면 자동으로 참조를 놓음
+    def __init__(self, shared):
+        self.shared = shared
+        self._digests = set()
+        weakref.finalize(self, shared.release, self._digests)
+
+    def __len__(self):
+        return len(self._digests)
+
+    # 이 세션에서 처음 쓰는 항목만 공유 캐시에서 참조를 잡음
+    def get(self, digest):
+        acquire = digest not in self._digests
+        parsed = self.shared.get(digest, acquire=acquire)
+        if parsed is not None and acquire:
+            self._digests.add(digest)
+        return parsed
+
+    def put(self, digest, parsed):
+        acquire = digest not in self._digests
+        self.shared.put(digest, parsed, acquire=acquire)
+        if acquire:
+            self._digests.add(digest)
+
+
+# 서버 프로세스에 하나만 만들어 모든 세션이 공유
+@st.cache_resource(show_spinner=False)
+def shared_parse_cache():
+    return SharedParseCache()
@@ -0,0 +1,18 @@
+import streamlit as st
+
+from utils.store import DEFAULT_PORTFOLIO, portfolio_dir
+
+
+# 세션의 포트폴리오 (주소의 ?portfolio=이름 으로 선택, 세션 시작 시 한 번만 읽음)
+# 병합 저장소와 로컬 DB 가 포트폴리오마다 따로 있어서 다른 사람의 데이터를 불러오거나 덮어쓰지 않음
+# 페이지를 옮기면 주소의 값이 사라지므로 모든 페이지 맨 위에서 호출
+def current_portfolio():
+    if 'portfolio' not in st.session_state:
+        portfolio = st.query_params.get('portfolio', DEFAULT_PORTFOLIO)
+        try:
+            portfolio_dir(portfolio)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        st.session_state.portfolio = portfolio
+    return st.session_state.portfolio
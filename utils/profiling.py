@@ -0,0 +1,138 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils.store import STORE_DIR
+
+# 페이지별로 보관하는 최근 재실행 기록 수
+HISTORY_SIZE = 20
+PROFILE_DIR = os.path.join(STORE_DIR, 'profiles')
+
+
+class RerunTimer:
+    # 한 번의 재실행에서 단계별 소요 시간과 처리한 행 수를 기록
+    # 기록은 시작하자마자 기록 목록에 들어가므로 st.rerun()/st.stop() 으로 중간에 끝나도 남음
+    # kind 는 '전체' (페이지 전체 재실행) 또는 '조각' (st.fragment 만 다시 실행)
+    def __init__(self, page, history, profile=False, kind='전체'):
+        self.page = page
+        self.kind = kind
+        self.finished = False
+        self.started = self.last = time.perf_counter()
+        self.record = {'시각': datetime.now().strftime('%H:%M:%S'), '구분': kind, '전체(ms)': None, 'phases': {}}
+        history.append(self.record)
+        self.profiler = cProfile.Profile() if profile else None
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    # 직전 lap (또는 시작) 이후 지금까지를 한 단계로 기록 (같은 이름이면 시간을 더함)
+    def lap(self, name, rows=None):
+        now = time.perf_counter()
+        phase = self.record['phases'].setdefault(name, {'ms': 0.0, 'rows': None})
+        phase['ms'] += (now - self.last) * 1000
+        if rows is not None:
+            phase['rows'] = rows
+        self.last = now
+
+    def stop_profiler(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def finish(self):
+        self.finished = True
+        self.record['전체(ms)'] = (time.perf_counter() - self.started) * 1000
+        self.stop_profiler()
+        if self.profiler is not None:
+            st.session_state.last_profile = (self.page, pstats.Stats(self.profiler))
+
+
+# 페이지 맨 위에서 호출: 디버그 토글을 사이드바에 표시하고 이번 재실행의 타이머를 반환
+def start_rerun(page):
+    with st.sidebar:
+        st.toggle("성능 측정 표시", key="debug_timing")
+        profile = st.toggle("cProfile 기록", key="debug_profile", disabled=not st.session_state.debug_timing)
+
+    histories = st.session_state.setdefault('rerun_timings', {})
+    history = histories.setdefault(page, deque(maxlen=HISTORY_SIZE))
+
+    # 이전 재실행이 중간에 끝나 프로파일러가 켜진 채로 남았다면 정리
+    previous = st.session_state.get('rerun_timer')
+    if previous is not None:
+        previous.stop_profiler()
+    timer = RerunTimer(page, history, profile=st.session_state.debug_timing and profile)
+    st.session_state.rerun_timer = timer
+    return timer
+
+
+# st.fragment 안에서 호출: 페이지 전체 재실행 중이면 그 타이머를 그대로 쓰고,
+# 조각만 다시 실행될 때는 조각용 기록을 새로 시작 (조각 안에서는 사이드바를 그릴 수 없으므로 기록만 함)
+def fragment_timer(page):
+    timer = st.session_state.get('rerun_timer')
+    if timer is not None and not timer.finished:
+        return timer
+
+    history = st.session_state.rerun_timings[page]
+    profile = st.session_state.get('debug_timing') and st.session_state.get('debug_profile')
+    timer = RerunTimer(page, history, profile=profile, kind='조각')
+    st.session_state.rerun_timer = timer
+    return timer
+
+
+# 조각용 기록만 마무리 (페이지 전체 재실행의 타이머는 finish_rerun 에서 마무리)
+def finish_fragment(timer):
+    if timer.kind == '조각':
+        timer.finish()
+
+
+# 화면에 표시된 프로파일을 파일로 저장 (snakeviz, pstats 등으로 열 수 있음)
+def save_profile(page, stats):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{page}_{datetime.now():%Y%m%d_%H%M%S}.prof")
+    stats.dump_stats(path)
+    st.session_state.saved_profile = path
+
+
+def timing_frame(history):
+    rows = []
+    for record in reversed(history):
+        row = {'시각': record['시각'], '구분': record['구분'], '전체(ms)': record['전체(ms)']}
+        for name, phase in record['phases'].items():
+            row[f"{name}(ms)"] = phase['ms']
+            if phase['rows'] is not None:
+                row[f"{name}(건)"] = phase['rows']
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# 페이지 맨 아래에서 호출: 타이머를 마무리하고 디버그가 켜져 있으면 사이드바에 최근 기록 표시
+def finish_rerun(timer):
+    timer.finish()
+    if not st.session_state.debug_timing:
+        return
+
+    with st.sidebar:
+        st.subheader("재실행 단계별 시간")
+        history = st.session_state.rerun_timings[timer.page]
+        st.dataframe(timing_frame(history).round(1), hide_index=True, use_container_width=True)
+        st.caption(f"최근 {len(history)}회 (최대 {HISTORY_SIZE}회), 최신 순")
+
+        last_profile = st.session_state.get('last_profile')
+        if last_profile is None or last_profile[0] != timer.page:
+            return
+
+        page, stats = last_profile
+        output = io.StringIO()
+        stats.stream = output
+        stats.sort_stats('cumulative').print_stats(15)
+        with st.expander("cProfile (누적 시간 상위 15개)"):
+            st.code(output.getvalue())
+        st.button("프로파일 파일로 저장", key="save_profile", on_click=save_profile, args=(page, stats))
+        saved_profile = st.session_state.pop('saved_profile', None)
+        if saved_profile is not None:
+            st.success(f"저장됨: {saved_profile}")
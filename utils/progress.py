@@ -0,0 +1,20 @@
+import pandas as pd
+import streamlit as st
+
+# 백그라운드 파싱 중 진행 상황을 새로 고치는 간격 (초)
+PROGRESS_INTERVAL = 1.0
+# 작업을 시작한 뒤 이 시간 안에 끝나면 진행 표시 없이 바로 병합 (초)
+INITIAL_WAIT = 0.5
+
+
+# 파싱 진행 상황 표시 (이 부분만 주기적으로 다시 실행)
+# 새로 병합할 수 있는 파일이 생기면 페이지 전체를 다시 실행해 병합하고 업체 목록에 반영
+@st.fragment(run_every=PROGRESS_INTERVAL)
+def show_ingest_progress(job):
+    done = job.done
+    st.progress(done / job.total, text=f"파일 처리 중... {done}/{job.total}")
+    with st.expander("파일별 진행 상황"):
+        st.dataframe(pd.DataFrame(job.status(), columns=['파일명', '상태']), hide_index=True)
+
+    if job.has_ready():
+        st.rerun()
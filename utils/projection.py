@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+PROJECTION_COLUMNS = ["투자번호", "회차", "지급예정일", "원금", "이자", "세금", "수수료"]
+
+
+# 이자소득세 14% + 지방소득세(소득세의 10%), 각각 10원 미만 절사 (배열 단위)
+def interest_tax(interest):
+    income_tax = np.asarray(interest, dtype=np.int64) * 14 // 100 // 10 * 10
+    local_tax = income_tax // 10 // 10 * 10
+    return income_tax + local_tax
+
+
+# 시작일로부터 months 개월 뒤 날짜 (말일을 넘으면 그 달의 마지막 날)
+def add_months(start_dates, months):
+    start_days = start_dates.astype("datetime64[D]")
+    start_months = start_dates.astype("datetime64[M]")
+    day_index = (start_days - start_months.astype("datetime64[D]")).astype(np.int64)
+
+    month_start = (start_months + months).astype("datetime64[D]")
+    next_month_start = (start_months + months + 1).astype("datetime64[D]")
+    last_day_index = (next_month_start - month_start).astype(np.int64) - 1
+
+    return month_start + np.minimum(day_index, last_day_index)
+
+
+# 전체 투자의 만기일시상환(매월 이자, 마지막 회차에 원금) 예상 회차를 한 번에 계산
+# 투자마다 반복하지 않고 (투자 × 회차) 전체를 한 줄짜리 배열로 펼쳐서 계산
+# fee_rate: 원금 대비 연 플랫폼 수수료율(%) (하나의 값 또는 투자별 배열)
+def project_schedule(amounts, rates, periods, start_dates, fee_rate=0.0):
+    amounts = np.asarray(amounts, dtype=np.int64)
+    rates = np.asarray(rates, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.int64)
+    fee_rates = np.broadcast_to(np.asarray(fee_rate, dtype=np.float64), amounts.shape)
+    start_dates = np.asarray(pd.to_datetime(start_dates).values, dtype="datetime64[D]")
+
+    loan_index = np.repeat(np.arange(len(amounts)), periods)
+    offsets = np.repeat(np.cumsum(periods) - periods, periods)
+    rounds = np.arange(len(loan_index)) - offsets + 1
+
+    loan_amounts = amounts[loan_index]
+    monthly_interest = np.floor(loan_amounts * rates[loan_index] / 100 / 12).astype(np.int64)
+    monthly_fee = np.floor(loan_amounts * fee_rates[loan_index] / 100 / 12).astype(np.int64)
+
+    return pd.DataFrame({
+        "투자번호": loan_index,
+        "회차": rounds,
+        "지급예정일": add_months(start_dates[loan_index], rounds),
+        "원금": np.where(rounds == periods[loan_index], loan_amounts, 0),
+        "이자": monthly_interest,
+        "세금": interest_tax(monthly_interest),
+        "수수료": monthly_fee,
+    }, columns=PROJECTION_COLUMNS)
+
+
+# 입력된 회차별 수수료로 추정한 투자별 연 수수료율(%) (project_schedule 의 fee_rate 와 같은 단위)
+# 회차 내역이 없는 투자는 같은 플랫폼 투자들의 평균, 플랫폼에도 없으면 0
+def estimated_fee_rates(investment_df, repayment_df):
+    entered = repayment_df.groupby("investment_id").agg(수수료=("수수료", "sum"), 회차수=("회차", "size"))
+    amounts = investment_df.set_index("id")["투자금액"].reindex(entered.index)
+    months = entered["회차수"] * amounts / 12
+    rates = (entered["수수료"] / months.where(months > 0) * 100).dropna()
+
+    platforms = investment_df.set_index("id")["서비스명"]
+    platform_rates = rates.groupby(platforms.reindex(rates.index)).mean()
+    by_investment = investment_df["id"].map(rates)
+    by_platform = investment_df["서비스명"].map(platform_rates)
+    return by_investment.fillna(by_platform).fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def _monthly_net(df, date_column, label):
+    months = df[date_column].dt.to_period("M").dt.to_timestamp().rename("월")
+    net = (df["이자"] - df["세금"] - df["수수료"]).groupby(months).sum()
+    return net.rename(label)
+
+
+# 월별 예상 순이자(이자 - 세금 - 수수료)와 상환 완료된 실제 순이자 비교표
+# fee_rate 를 주지 않으면 입력된 회차별 수수료로 투자별 수수료율을 추정 (실현 쪽과 같은 기준으로 비교)
+def projected_vs_realized(investment_df, repayment_df, fee_rate=None):
+    if fee_rate is None:
+        fee_rate = estimated_fee_rates(investment_df, repayment_df)
+    schedule = project_schedule(
+        investment_df["투자금액"], investment_df["수익률"], investment_df["투자기간"],
+        investment_df["투자일자"], fee_rate,
+    )
+    projected = _monthly_net(schedule, "지급예정일", "예상 순이자")
+
+    completed = repayment_df[repayment_df["상환완료"] & repayment_df["지급예정일"].notna()]
+    realized = _monthly_net(completed, "지급예정일", "실현 순이자")
+
+    monthly = pd.concat([projected, realized], axis=1).fillna(0).astype(np.int64).sort_index()
+    monthly["누적 예상"] = monthly["예상 순이자"].cumsum()
+    monthly["누적 실현"] = monthly["실현 순이자"].cumsum()
+    return monthly.reset_index()
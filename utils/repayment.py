@@ -0,0 +1,57 @@
+import pandas as pd
+
+# 새로운 컬럼명 매핑 (같은 컬럼으로 가는 항목은 앞에 있는 값을 우선 사용)
+COLUMN_MAPPING = {
+    '실제 지급일': '지급일',
+    '지급원금(원)': '지급원금',
+    '지급이자(원)': '지급이자',
+    '연체이자(원)': '연체이자',
+    '실제 지급금액(원)': '실제지급액',
+    '예정지급일': '지급일',
+    '예정 지급원금(원)': '지급원금',
+    '예정 지급이자(원)': '지급이자'
+}
+
+REPAYMENT_COLUMNS = ['회차', '지급일', '지급원금', '지급이자', '연체이자', '수수료', '실제지급액']
+
+
+def _source_columns(df, target):
+    sources = [target] if target in df.columns else []
+    sources.extend(source for source, mapped in COLUMN_MAPPING.items() if mapped == target and source in df.columns)
+    return sources
+
+
+# 회차별 상세정보 전체를 한 번에 정리 (행 단위 apply 없이 컬럼 단위로 계산)
+# key_columns 로 지정한 컬럼(예: 업체명, 상품명)은 결과 앞쪽에 그대로 남김
+def process_repayment_data(df, key_columns=()):
+    result = pd.DataFrame(index=df.index)
+    for col in key_columns:
+        if col in df.columns:
+            result[col] = df[col]
+
+    # 컬럼명 변경 및 필요한 컬럼 생성
+    # 실제/예정 지급 컬럼이 함께 있는 경우(진행중·종료 파일을 같이 올린 경우) 실제 값을 우선으로 합침
+    for col in REPAYMENT_COLUMNS:
+        sources = _source_columns(df, col)
+        if not sources:
+            result[col] = None
+            continue
+        values = df[sources[0]]
+        for source in sources[1:]:
+            values = values.fillna(df[source])
+        result[col] = values
+
+    # 수수료 컬럼 추가
+    result['수수료'] = 0
+
+    # 예정 지급건의 실제지급액 계산
+    mask = result['실제지급액'].isna() & result['지급원금'].notna() & result['지급이자'].notna()
+    if mask.any():
+        result.loc[mask, '실제지급액'] = (
+            result.loc[mask, '지급원금'] + result.loc[mask, '지급이자'] - result.loc[mask, '수수료']
+        )
+
+    # 연체이자 0으로 초기화
+    result['연체이자'] = result['연체이자'].fillna(0)
+
+    return result
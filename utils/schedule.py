@@ -0,0 +1,70 @@
+import pandas as pd
+
+from utils.projection import project_schedule
+
+# 회차별 상환 내역 한 행의 항목
+REPAYMENT_FIELDS = ["회차", "지급예정일", "원금", "이자", "세금", "수수료", "상환완료"]
+AMOUNT_FIELDS = ["원금", "이자", "세금", "수수료"]
+
+
+def new_repayment_row(period_num=1):
+    return {"회차": period_num, "지급예정일": None, "원금": 0, "이자": 0, "세금": 0, "수수료": 0, "상환완료": False}
+
+
+# 투자금액, 연 수익률, 기간으로 만기일시상환(매월 이자, 마지막 회차에 원금) 회차 목록 생성
+# fee_rate: 원금 대비 연 플랫폼 수수료율(%)로 매월 나누어 차감
+# (대시보드의 예상 현금흐름과 같은 계산을 사용)
+def generate_installments(amount, rate, period, start_date, fee_rate=0.0):
+    schedule = project_schedule([amount], [rate], [period], [start_date], fee_rate)
+
+    installments = []
+    for row in schedule.itertuples(index=False):
+        installments.append({
+            "회차": int(row.회차),
+            "지급예정일": row.지급예정일.date(),
+            "원금": int(row.원금),
+            "이자": int(row.이자),
+            "세금": int(row.세금),
+            "수수료": int(row.수수료),
+            "상환완료": False,
+        })
+    return installments
+
+
+# 표 편집기에 넘길 데이터프레임 (지급예정일은 날짜 컬럼으로 인식되도록 변환)
+def repayment_frame(rows):
+    df = pd.DataFrame(rows, columns=REPAYMENT_FIELDS)
+    df["지급예정일"] = pd.to_datetime(df["지급예정일"])
+    return df
+
+
+# 표 편집기가 돌려주는 값(날짜는 문자열)을 원래 형식으로 변환
+def _convert(field, value):
+    if field == "지급예정일":
+        return None if value is None or pd.isna(value) else pd.Timestamp(value).date()
+    if field == "상환완료":
+        return bool(value)
+    return 0 if value is None else int(value)
+
+
+# 표 편집기의 변경분(수정/삭제/추가 행)만 반영한 목록 반환
+# 바뀌지 않은 행은 원래 딕셔너리를 그대로 재사용
+def apply_grid_changes(rows, changes):
+    edited_rows = changes.get("edited_rows", {})
+    deleted_rows = set(changes.get("deleted_rows", []))
+
+    result = []
+    for i, row in enumerate(rows):
+        if i in deleted_rows:
+            continue
+        edits = edited_rows.get(i) or edited_rows.get(str(i))
+        if edits:
+            row = {**row, **{field: _convert(field, value) for field, value in edits.items() if field in REPAYMENT_FIELDS}}
+        result.append(row)
+
+    for added in changes.get("added_rows", []):
+        row = new_repayment_row(len(result) + 1)
+        row.update({field: _convert(field, value) for field, value in added.items() if field in REPAYMENT_FIELDS})
+        result.append(row)
+
+    return result
@@ -0,0 +1,103 @@
+import time
+from collections import defaultdict
+
+import pandas as pd
+import streamlit as st
+
+from utils.group_index import GROUP_KEYS
+
+# 검색 대상 컬럼
+SEARCH_COLUMNS = ['상품명', '업체명', '상품유형']
+MAX_RESULTS = 50
+# 컬럼 값을 이어 붙일 때 쓰는 구분 문자 (검색어에는 나오지 않으므로 컬럼 경계를 넘는 일치가 생기지 않음)
+SEPARATOR = '\x1f'
+
+
+def _normalize(text):
+    return ''.join(str(text).lower().split())
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+# 상품별 회차 요약 (회차 수, 금액 합계, 마지막 지급일)
+def product_summary(normalized):
+    grouped = normalized.groupby(GROUP_KEYS, sort=False, observed=True)
+    summary = grouped.agg(**{
+        '회차 수': ('회차', 'size'),
+        '지급원금': ('지급원금', 'sum'),
+        '지급이자': ('지급이자', 'sum'),
+        '실제지급액': ('실제지급액', 'sum'),
+        '마지막 지급일': ('지급일', 'max'),
+    })
+    return summary
+
+
+class ProductSearch:
+    # 상품명, 업체명, 상품유형의 글자 2-gram 역색인
+    # 병합 데이터가 바뀔 때 한 번 만들어 두고, 검색할 때는 색인 교집합으로 후보만 확인
+    def __init__(self, df1, normalized):
+        columns = [col for col in SEARCH_COLUMNS if col in df1.columns]
+        products = df1.drop_duplicates(GROUP_KEYS).reset_index(drop=True)
+
+        # 검색 결과로 보여줄 상품 정보와 회차 요약 (미리 합쳐 둠)
+        summary = product_summary(normalized)
+        keys = pd.MultiIndex.from_arrays([products[col] for col in GROUP_KEYS])
+        info = products[[col for col in ['업체명', '상품명', '상품유형', '투자계약일'] if col in products.columns]]
+        self.results = pd.concat([info, summary.reindex(keys).reset_index(drop=True)], axis=1)
+
+        values = [products[col].astype(object).where(products[col].notna(), '').tolist() for col in columns]
+        self._texts = [SEPARATOR.join(_normalize(value) for value in row) for row in zip(*values)]
+        self._chars = defaultdict(set)  # 글자 하나 -> 상품 위치 (한 글자 검색용)
+        self._grams = defaultdict(set)  # 2-gram -> 상품 위치
+        for position, text in enumerate(self._texts):
+            for char in set(text):
+                self._chars[char].add(position)
+            for gram in _bigrams(text):
+                self._grams[gram].add(position)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _postings(self, term):
+        if len(term) == 1:
+            return [self._chars.get(term, set())]
+        return [self._grams.get(gram, set()) for gram in _bigrams(term)]
+
+    # 공백으로 나눈 검색어가 모두 들어 있는 상품 (최대 limit 개, 전체 일치 수)
+    def search(self, query, limit=MAX_RESULTS):
+        terms = [_normalize(term) for term in query.split()]
+        terms = [term for term in terms if term]
+        if not terms:
+            return self.results.iloc[0:0], 0
+
+        candidates = None
+        for term in terms:
+            # 작은 목록부터 교집합
+            for posting in sorted(self._postings(term), key=len):
+                candidates = set(posting) if candidates is None else candidates & posting
+                if not candidates:
+                    return self.results.iloc[0:0], 0
+
+        # 2-gram 이 모두 있어도 순서가 다를 수 있으므로 실제로 포함되는지 확인
+        matches = sorted(position for position in candidates if all(term in self._texts[position] for term in terms))
+        return self.results.iloc[matches[:limit]], len(matches)
+
+
+# 전체 업체/상품 검색 (입력할 때는 이 부분만 다시 실행)
+@st.fragment
+def show_search(search):
+    query = st.text_input("상품 검색", placeholder="상품명, 업체명, 상품유형", key="product_search")
+    if not query.strip():
+        return
+
+    started = time.perf_counter()
+    results, total = search.search(query)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if total == 0:
+        st.info(f"'{query}'에 해당하는 상품이 없습니다.")
+        return
+    st.caption(f"{total}개 상품 중 {len(results)}개 표시 ({elapsed:.1f}ms)")
+    st.dataframe(results, hide_index=True, use_container_width=True)
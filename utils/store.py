@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# 병합된 데이터를 저장할 로컬 디렉터리 (프로젝트 루트의 data/)
+STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# 포트폴리오별 저장소 (여러 사람이 같은 서버를 쓸 때 서로의 병합 데이터를 덮어쓰지 않도록 분리)
+# 기본 포트폴리오는 이전 버전과 같이 data/ 에 바로 저장하고, 나머지는 data/portfolios/<이름>/ 에 저장
+# 한 포트폴리오는 한 사람이 쓰는 것을 전제로 함 (같은 포트폴리오를 동시에 병합하면 마지막에 저장한 내용이 남음)
+PORTFOLIO_DIR = os.path.join(STORE_DIR, 'portfolios')
+DEFAULT_PORTFOLIO = 'default'
+PORTFOLIO_NAME = re.compile(r'\w[\w.-]*')
+
+# 투자내역 시트(df1)와 회차별 상세정보 시트(df2) 테이블명
+MAIN_TABLE = 'investments'
+DETAIL_TABLE = 'repayments'
+# process_repayment_data 로 정리한 회차별 상세정보 (일괄 수집 시 미리 만들어 둠)
+NORMALIZED_TABLE = 'repayments_normalized'
+# 일괄 수집에서 이미 반영한 파일 목록 (경로 -> 수정 시각, 크기, 내용 해시)
+MANIFEST_FILE = 'manifest.json'
+# 저장할 때마다 새로 쓰는 저장소 세대 id (불러온 뒤에 다른 세션이나 일괄 수집이 저장했는지 확인)
+GENERATION_FILE = 'generation'
+# 다른 프로세스(일괄 수집 CLI)와 함께 쓰는 잠금 파일
+LOCK_FILE = '.lock'
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def portfolio_dir(name=DEFAULT_PORTFOLIO):
+    if not PORTFOLIO_NAME.fullmatch(name):
+        raise ValueError(f"포트폴리오 이름에는 문자, 숫자, '_', '-', '.' 만 쓸 수 있습니다: {name!r}")
+    if name == DEFAULT_PORTFOLIO:
+        return STORE_DIR
+    return os.path.join(PORTFOLIO_DIR, name)
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK 은 10초 동안만 기다리므로 잠길 때까지 다시 시도
+            time.sleep(0.1)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class StoreLock:
+    # 저장소 디렉터리 하나의 잠금
+    # 서버 안의 세션(스레드)끼리는 RLock 으로, 일괄 수집 CLI 같은 다른 프로세스와는 잠금 파일로 배타적으로 사용
+    # 같은 스레드에서 겹쳐 잡아도 되고, 잠금 파일은 가장 바깥에서 한 번만 잡음
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(self.store_dir, exist_ok=True)
+                f = open(os.path.join(self.store_dir, LOCK_FILE), 'a+b')
+                try:
+                    _lock_file(f)
+                except BaseException:
+                    f.close()
+                    raise
+                self._file = f
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._lock.release()
+
+
+# 저장소 디렉터리별 잠금 (저장소 세대를 확인하고 저장하는 동안 다른 세션이나 프로세스가 끼어들지 않도록)
+def store_lock(store_dir=STORE_DIR):
+    with _locks_guard:
+        key = os.path.abspath(store_dir)
+        if key not in _locks:
+            _locks[key] = StoreLock(store_dir)
+        return _locks[key]
+
+
+# 저장소 세대 id (저장된 적이 없거나 삭제된 뒤면 None)
+def store_generation(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, GENERATION_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return f.read().strip() or None
+
+
+def _write_generation(store_dir):
+    generation = uuid.uuid4().hex
+    path = os.path.join(store_dir, GENERATION_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(generation)
+    os.replace(tmp_path, path)
+    return generation
+
+
+def table_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f'{name}.arrow')
+
+
+# Arrow IPC(Feather v2) 형식으로 저장
+# 압축하지 않아야 읽을 때 메모리 매핑으로 바로 열 수 있음
+def write_table(df, name, store_dir=STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    path = table_path(name, store_dir)
+    tmp_path = path + '.tmp'
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+
+    # 기록 도중 중단되어도 기존 파일이 깨지지 않도록 교체
+    os.replace(tmp_path, path)
+
+
+def read_table(name, store_dir=STORE_DIR):
+    path = table_path(name, store_dir)
+    if not os.path.exists(path):
+        return None
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def remove_table(name, store_dir=STORE_DIR):
+    path = table_path(name, store_dir)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# 정리된 회차 내역을 함께 주지 않으면 이전에 저장된 것은 더 이상 맞지 않으므로 삭제
+# 새 저장소 세대 id 반환
+def save_combined(df1, df2, normalized=None, store_dir=STORE_DIR):
+    with store_lock(store_dir):
+        write_table(df1, MAIN_TABLE, store_dir)
+        write_table(df2, DETAIL_TABLE, store_dir)
+        if normalized is not None:
+            write_table(normalized, NORMALIZED_TABLE, store_dir)
+        else:
+            remove_table(NORMALIZED_TABLE, store_dir)
+        return _write_generation(store_dir)
+
+
+# 저장된 병합 데이터가 없으면 None 반환
+# 세대 id 와 함께 일관되게 읽으려면 store_lock 안에서 store_generation 과 같이 호출
+def load_combined(store_dir=STORE_DIR):
+    with store_lock(store_dir):
+        df1 = read_table(MAIN_TABLE, store_dir)
+        df2 = read_table(DETAIL_TABLE, store_dir)
+    if df1 is None or df2 is None:
+        return None
+    return df1, df2
+
+
+# 저장된 데이터와 같은 시점에 정리된 회차 내역 (없으면 None)
+def load_normalized(store_dir=STORE_DIR):
+    with store_lock(store_dir):
+        return read_table(NORMALIZED_TABLE, store_dir)
+
+
+def load_manifest(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, store_dir=STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+# 병합 데이터와 일괄 수집 목록만 삭제 (같은 디렉터리의 로컬 DB, 프로파일, 내보내기 파일, 다른 포트폴리오는 유지)
+def clear_store(store_dir=STORE_DIR):
+    with store_lock(store_dir):
+        for name in (MAIN_TABLE, DETAIL_TABLE, NORMALIZED_TABLE):
+            remove_table(name, store_dir)
+        for name in (MANIFEST_FILE, GENERATION_FILE):
+            path = os.path.join(store_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+
+from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.workbook import file_digest
+
+# 세션 하나가 아직 파싱하지 않은 원본에 쓸 수 있는 메모리 (바이트)
+# 파싱 결과는 모든 세션이 공유하는 캐시에서 따로 관리 (utils.parse_cache.SHARED_CACHE_BUDGET)
+SESSION_MEMORY_BUDGET = 256 * 1024 * 1024
+MB = 1024 * 1024
+
+
+class UploadEntry:
+    # 등록된 업로드 파일 하나 (ingest_files 에 UploadedFile 대신 넘길 수 있음)
+    # 파싱이 끝나면 원본 바이트는 해제하고 해시만 남김
+    def __init__(self, name, digest, data):
+        self.name = name
+        self.digest = digest
+        self.file_id = digest
+        self.size = len(data)
+        self._data = data
+
+    @property
+    def released(self):
+        return self._data is None
+
+    def getvalue(self):
+        if self._data is None:
+            raise ValueError("원본 데이터가 메모리에서 해제되었습니다. 파일을 다시 업로드하세요.")
+        return self._data
+
+    def release(self):
+        self._data = None
+
+
+class UploadRegistry:
+    # 세션에서 업로드한 파일 목록 (파일 내용 해시 기준으로 한 번만 등록)
+    def __init__(self):
+        self._entries = OrderedDict()  # 해시 -> UploadEntry
+        self._digests = {}  # 업로더 file_id -> 해시 (같은 업로드를 다시 해시하지 않음)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    # 새 파일만 등록하고 (추가된 수, 중복으로 건너뛴 수, 한도를 넘어 제외한 파일명 목록) 반환
+    # 파싱 전 원본의 합계가 budget 을 넘는 파일은 등록하지 않음 (다음 실행에서 다시 올릴 수 있음)
+    def add(self, files, budget=SESSION_MEMORY_BUDGET):
+        added = 0
+        duplicates = 0
+        rejected = []
+        pending_bytes = self.pending_bytes
+        for file in files:
+            digest = self._digests.get(file.file_id)
+            if digest is None:
+                data = file.getvalue()
+                digest = file_digest(data)
+                if digest not in self._entries:
+                    if pending_bytes + len(data) > budget:
+                        rejected.append(file.name)
+                        continue
+                    self._entries[digest] = UploadEntry(file.name, digest, data)
+                    self._digests[file.file_id] = digest
+                    pending_bytes += len(data)
+                    added += 1
+                    continue
+                self._digests[file.file_id] = digest
+            duplicates += 1
+        return added, duplicates, rejected
+
+    # 파싱이 끝난 파일의 원본 해제
+    def release(self, digest):
+        entry = self._entries.get(digest)
+        if entry is not None:
+            entry.release()
+
+    # 다시 업로드할 수 있도록 목록에서 제거
+    def remove(self, digest):
+        self._entries.pop(digest, None)
+        self._digests = {file_id: d for file_id, d in self._digests.items() if d != digest}
+
+    # 아직 해제되지 않은 원본 바이트 합계
+    @property
+    def pending_bytes(self):
+        return sum(entry.size for entry in self._entries.values() if not entry.released)
+
+    # 업로더 위젯이 들고 있는 파일 중 레지스트리의 원본과 같은 객체가 아닌 파일의 바이트
+    # (선택만 하고 아직 실행하지 않은 파일도 세션 메모리를 차지하므로 한도 계산에 포함)
+    def held_bytes(self, files):
+        held = 0
+        for file in files:
+            entry = self._entries.get(self._digests.get(file.file_id))
+            if entry is None or entry.released:
+                held += file.size
+        return held
+
+
+# 레지스트리에 등록한 업로드 파일을 Streamlit 의 업로드 파일 저장소에서 제거
+# 업로더 위젯을 비워도 브라우저가 지우기 전까지는 저장소가 원본을 들고 있으므로 직접 제거해야
+# 파싱이 끝난 뒤 release() 로 원본 메모리가 실제로 해제됨 (st.chat_input 과 같은 방식)
+def discard_uploaded(files):
+    ctx = get_script_run_ctx()
+    if ctx is None or not isinstance(ctx.uploaded_file_mgr, MemoryUploadedFileManager):
+        return
+    for file in files:
+        ctx.uploaded_file_mgr.remove_file(session_id=ctx.session_id, file_id=file.file_id)
@@ -0,0 +1,82 @@
+import hashlib
+import importlib.util
+import io
+from collections import namedtuple
+
+import pandas as pd
+
+from utils.dtypes import compact_frame
+
+# 가능한 시트명 목록 정의
+MAIN_SHEETS = ['세부 투자내역(투자진행중)', '세부 투자내역(투자종료)', '투자내역']
+DETAIL_SHEETS = ['세부 투자내역(투자진행중) 회차별 상세정보', '세부 투자내역(투자종료) 회차별 상세정보', '회차별 상세정보']
+
+# 투자내역 시트에서 화면에 사용하는 컬럼 (나머지는 읽지 않음)
+MAIN_COLUMNS = ['업체명', '상품명', '투자계약일', '상품유형']
+# 회차별 상세정보 시트에서 어느 페이지에서도 사용하지 않는 컬럼
+DETAIL_SKIP_COLUMNS = ['투자계약 구분', '투자계약일', '상품유형']
+
+# 파일 하나를 파싱한 결과 (시트가 없으면 main/detail 은 None)
+ParsedWorkbook = namedtuple('ParsedWorkbook', ['file_name', 'sheet_main', 'sheet_detail', 'main', 'detail'])
+
+
+# 파일 내용 기준 해시 (같은 내용이면 파일명이 달라도 같은 값)
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# 사용할 엑셀 읽기 엔진
+# calamine(Rust 기반)이 설치되어 있으면 우선 사용하고, 없으면 openpyxl 읽기 전용 모드로 읽음
+def default_engine():
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return 'openpyxl'
+
+
+READER_ENGINE = default_engine()
+
+
+def open_workbook(data, engine=None):
+    return pd.ExcelFile(io.BytesIO(data), engine=engine or READER_ENGINE)
+
+
+# 첫 번째로 존재하는 시트 선택
+def resolve_sheets(sheet_names):
+    sheet_main = next((name for name in MAIN_SHEETS if name in sheet_names), None)
+    sheet_detail = next((name for name in DETAIL_SHEETS if name in sheet_names), None)
+    return sheet_main, sheet_detail
+
+
+# 필요한 컬럼만 읽도록 시트별로 컬럼을 걸러냄
+def read_sheets(xls, sheet_main, sheet_detail):
+    df1 = pd.read_excel(xls, sheet_name=sheet_main, usecols=lambda col: col in MAIN_COLUMNS)
+    df2 = pd.read_excel(xls, sheet_name=sheet_detail, usecols=lambda col: col not in DETAIL_SKIP_COLUMNS)
+    return df1, df2
+
+
+# 시트 탐색, 파싱, 파일명 추가까지 한 번에 수행 (프로세스 풀 워커에서도 호출됨)
+def parse_workbook(data, file_name, engine=None):
+    xls = open_workbook(data, engine)
+    sheet_main, sheet_detail = resolve_sheets(xls.sheet_names)
+    if not (sheet_main and sheet_detail):
+        return ParsedWorkbook(file_name, sheet_main, sheet_detail, None, None)
+
+    df1, df2 = read_sheets(xls, sheet_main, sheet_detail)
+
+    # 파일명 추가하여 중복 확인 시 사용
+    df1['파일명'] = file_name
+    df2['파일명'] = file_name
+
+    # 캐시에 들어가 여러 세션이 공유하므로 파싱할 때 한 번만 컬럼 형식을 줄여 둠
+    return ParsedWorkbook(file_name, sheet_main, sheet_detail, compact_frame(df1), compact_frame(df2))
+
+
+# 같은 내용의 파일이 다른 이름으로 올라온 경우 파일명만 바꿔서 사용 (캐시된 원본은 그대로 둠)
+def with_file_name(parsed, file_name):
+    if parsed.file_name == file_name or parsed.main is None:
+        return parsed
+    return parsed._replace(
+        file_name=file_name,
+        main=parsed.main.assign(파일명=file_name),
+        detail=parsed.detail.assign(파일명=file_name),
+    )
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# 연 수익률 탐색 범위 (-99.9% ~ 1000%)
+RATE_LOWER = -0.999
+RATE_UPPER = 10.0
+
+
+# 그룹별 현금흐름을 (그룹 수 × 최대 현금흐름 수) 행렬로 펼침 (빈 칸은 금액 0)
+def _pad_flows(codes, dates, amounts, group_count):
+    order = np.argsort(codes, kind="stable")
+    codes, dates, amounts = codes[order], dates[order], amounts[order]
+
+    counts = np.bincount(codes, minlength=group_count)
+    width = max(int(counts.max()), 1) if len(counts) else 1
+    positions = np.arange(len(codes)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    first_days = np.full(group_count, np.iinfo(np.int64).max)
+    np.minimum.at(first_days, codes, days)
+
+    flow_matrix = np.zeros((group_count, width))
+    year_matrix = np.zeros((group_count, width))
+    flow_matrix[codes, positions] = amounts
+    year_matrix[codes, positions] = (days - first_days[codes]) / 365.0
+    return flow_matrix, year_matrix
+
+
+def _npv(rates, flow_matrix, year_matrix):
+    discount = (1.0 + rates)[:, None] ** (-year_matrix)
+    npv = (flow_matrix * discount).sum(axis=1)
+    derivative = (-year_matrix * flow_matrix * discount / (1.0 + rates)[:, None]).sum(axis=1)
+    return npv, derivative
+
+
+# 여러 그룹(상품)의 XIRR 을 한 번에 계산
+# 모든 그룹에 뉴턴법을 동시에 적용하고, 수렴하지 않은 그룹만 이분법으로 다시 찾음
+# groups: 그룹 키, dates: 현금흐름 날짜, amounts: 금액(투자는 음수, 회수는 양수)
+# 반환값: 그룹 키를 인덱스로 하는 연 수익률 (입금/출금 중 하나만 있으면 NaN)
+def xirr(groups, dates, amounts, max_iter=50, tol=1e-9):
+    codes, keys = pd.factorize(pd.Series(groups), sort=False)
+    dates = np.asarray(pd.to_datetime(dates).values, dtype="datetime64[D]")
+    amounts = np.asarray(amounts, dtype=np.float64)
+    group_count = len(keys)
+
+    flow_matrix, year_matrix = _pad_flows(codes, dates, amounts, group_count)
+    solvable = (flow_matrix > 0).any(axis=1) & (flow_matrix < 0).any(axis=1)
+
+    rates = np.full(group_count, 0.1)
+    converged = ~solvable
+    with np.errstate(all="ignore"):
+        for _ in range(max_iter):
+            active = ~converged
+            if not active.any():
+                break
+            npv, derivative = _npv(rates, flow_matrix, year_matrix)
+            step = np.where(derivative != 0, npv / derivative, np.nan)
+            new_rates = np.clip(rates - step, RATE_LOWER, RATE_UPPER)
+            rates = np.where(active & np.isfinite(new_rates), new_rates, rates)
+            converged |= active & (np.abs(step) < tol)
+
+        # 뉴턴법이 수렴하지 않은 그룹은 부호가 바뀌는 구간을 이분법으로 탐색
+        retry = solvable & ~converged
+        if retry.any():
+            low = np.full(group_count, RATE_LOWER)
+            high = np.full(group_count, RATE_UPPER)
+            npv_low, _ = _npv(low, flow_matrix, year_matrix)
+            npv_high, _ = _npv(high, flow_matrix, year_matrix)
+            bracketed = retry & (np.sign(npv_low) != np.sign(npv_high))
+            for _ in range(200):
+                middle = (low + high) / 2
+                npv_middle, _ = _npv(middle, flow_matrix, year_matrix)
+                same_side = np.sign(npv_middle) == np.sign(npv_low)
+                low = np.where(bracketed & same_side, middle, low)
+                npv_low = np.where(bracketed & same_side, npv_middle, npv_low)
+                high = np.where(bracketed & ~same_side, middle, high)
+            rates = np.where(bracketed, (low + high) / 2, rates)
+            converged |= bracketed
+
+    rates = np.where(solvable & converged, rates, np.nan)
+    return pd.Series(rates, index=keys)
+
+
+# 투자/상환 내역으로 상품별, 전체 포트폴리오의 실효 수익률(XIRR) 계산
+# 투자금액은 투자일자에 지출, 상환 완료 회차의 원금 + 이자 - 세금 - 수수료는 지급예정일에 회수
+# 아직 돌려받지 못한 원금은 기준일(as_of)에 액면가로 회수한 것으로 봄
+def realized_yields(investment_df, repayment_df, as_of):
+    completed = repayment_df[repayment_df["상환완료"] & repayment_df["지급예정일"].notna()]
+    received = completed["원금"] + completed["이자"] - completed["세금"] - completed["수수료"]
+    outstanding = investment_df["투자금액"] - investment_df["id"].map(
+        completed.groupby("investment_id")["원금"].sum()
+    ).fillna(0)
+
+    flows = pd.concat([
+        pd.DataFrame({"id": investment_df["id"], "date": investment_df["투자일자"], "amount": -investment_df["투자금액"]}),
+        pd.DataFrame({"id": completed["investment_id"], "date": completed["지급예정일"], "amount": received}),
+        pd.DataFrame({"id": investment_df["id"], "date": pd.Timestamp(as_of), "amount": outstanding.clip(lower=0)}),
+    ], ignore_index=True)
+    flows = flows[flows["amount"] != 0]
+
+    by_product = xirr(flows["id"], flows["date"], flows["amount"])
+    portfolio = xirr(np.zeros(len(flows), dtype=np.int64), flows["date"], flows["amount"])
+
+    product_yields = investment_df[["id", "서비스명", "상품명", "투자금액", "수익률"]].copy()
+    product_yields["실효 수익률"] = product_yields["id"].map(by_product) * 100
+    product_yields = product_yields.rename(columns={"수익률": "약정 수익률"}).drop(columns=["id"])
+
+    portfolio_yield = portfolio.iloc[0] * 100 if len(portfolio) else float("nan")
+    return product_yields, portfolio_yield